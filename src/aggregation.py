@@ -0,0 +1,244 @@
+import numpy as np
+
+
+# ================================================================================================
+# FACTORIZE
+# ================================================================================================
+# Bảng kết quả = dict {tên cột: np.ndarray} cùng độ dài (ghi thẳng được bằng storage.save_columns)
+SENTIMENT_COLUMNS = ('neg', 'neu', 'pos')  # nhãn 0 / 1 / 2
+
+
+def _as_array(col):
+    col = np.asarray(col)
+    if col.dtype.kind == 'S':
+        # Cột bytes (genfromtxt) -> chuỗi unicode để so khớp với key dạng str
+        col = np.char.decode(col, 'utf-8')
+    return col
+
+
+def truncate_day(dates):
+    """datetime64 bất kỳ độ phân giải -> datetime64[D] (giống .astype('datetime64[D]') trong notebook)."""
+    return np.asarray(dates).astype('datetime64[D]')
+
+
+def factorize(values):
+    """
+    Mã hoá một cột thành số nguyên liên tục.
+    Trả về (codes, uniques): uniques đã sắp xếp, values == uniques[codes].
+    """
+    uniques, codes = np.unique(_as_array(values), return_inverse=True)
+    return codes.ravel().astype(np.int64), uniques
+
+
+def factorize_keys(*columns):
+    """
+    Mã hoá nhiều cột key cùng lúc (group theo tổ hợp key).
+    Trả về (codes, keys): keys là list mảng, keys[j][g] = giá trị cột j của nhóm g.
+    Các nhóm được sắp theo thứ tự từ điển của (cột 0, cột 1, ...).
+    """
+    if not columns:
+        raise ValueError("Cần ít nhất một cột key")
+    parts = [factorize(col) for col in columns]
+    if len(parts) == 1:
+        codes, uniques = parts[0]
+        return codes, [uniques]
+
+    # Ghép mã các cột thành một số nguyên duy nhất (mixed radix) rồi factorize lại cho liền mạch
+    shape = tuple(len(uniques) for _, uniques in parts)
+    combined = np.ravel_multi_index([codes for codes, _ in parts], shape)
+    group_ids, codes = np.unique(combined, return_inverse=True)
+    per_column = np.unravel_index(group_ids, shape)
+    keys = [uniques[idx] for (_, uniques), idx in zip(parts, per_column)]
+    return codes.ravel().astype(np.int64), keys
+
+
+def explode(col, split=str.split, lower=True, skip=('no_hashtag', '')):
+    """
+    Tách cột nhiều giá trị (vd. hashtags "pfizer vaccine") thành từng phần tử.
+    Trả về (rows, items): items[i] thuộc dòng rows[i], dùng rows để lấy giá trị tương ứng
+    (vd. labels[rows]). Dòng có giá trị thuộc `skip` bị bỏ qua (giống notebook).
+    """
+    rows = []
+    items = []
+    for i, raw in enumerate(col):
+        text = raw.decode('utf-8') if isinstance(raw, bytes) else str(raw)
+        if text.strip() in skip:
+            continue
+        for item in split(text):
+            item = item.strip()
+            if lower:
+                item = item.lower()
+            if item:
+                rows.append(i)
+                items.append(item)
+    return np.array(rows, dtype=np.int64), np.array(items, dtype=str)
+
+
+# ================================================================================================
+# GROUP BY
+# ================================================================================================
+class GroupBy:
+    """
+    Gom nhóm một lần theo một hoặc nhiều cột key, sau đó mỗi phép tổng hợp chỉ là
+    một lần np.bincount (count/sum/mean/phân bố nhãn) hoặc np.*.reduceat (min/max).
+
+    - keys: một cột hoặc list/tuple các cột
+    - names: tên cột key trong bảng kết quả (mặc định 'key', 'key_1', ...)
+    """
+
+    def __init__(self, keys, names=None):
+        if isinstance(keys, (list, tuple)):
+            columns = list(keys)
+        else:
+            columns = [keys]
+        self.codes, self.keys = factorize_keys(*columns)
+        self.n_groups = len(self.keys[0])
+        if names is None:
+            names = ['key'] + [f'key_{j}' for j in range(1, len(columns))]
+        elif isinstance(names, str):
+            names = [names]
+        self.names = list(names)
+        self._order = None
+
+    def __len__(self):
+        return self.n_groups
+
+    def _values(self, values):
+        values = np.asarray(values)
+        if len(values) != len(self.codes):
+            raise ValueError(f"values có {len(values)} dòng, key có {len(self.codes)} dòng")
+        return values
+
+    def key_table(self):
+        return {name: key for name, key in zip(self.names, self.keys)}
+
+    # --- Tổng hợp bằng bincount ---
+    def size(self):
+        return np.bincount(self.codes, minlength=self.n_groups)
+
+    def sum(self, values):
+        return np.bincount(self.codes, weights=self._values(values).astype(np.float64),
+                           minlength=self.n_groups)
+
+    def mean(self, values):
+        counts = self.size()
+        sums = self.sum(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+
+    def label_counts(self, labels, n_labels=None):
+        """Ma trận (n_groups, n_labels): số dòng của mỗi nhãn trong từng nhóm (nhãn trong [0, n_labels))."""
+        labels = self._values(labels).astype(np.int64)
+        if n_labels is None:
+            n_labels = int(labels.max()) + 1 if len(labels) else 0
+        if len(labels) and (labels.min() < 0 or labels.max() >= n_labels):
+            # group * n_labels + label sẽ rơi sang ô của nhóm bên cạnh -> báo lỗi thay vì đếm sai
+            raise ValueError(f"Nhãn phải nằm trong [0, {n_labels}), có nhãn "
+                             f"{int(labels.min()) if labels.min() < 0 else int(labels.max())}")
+        flat = np.bincount(self.codes * n_labels + labels, minlength=self.n_groups * n_labels)
+        return flat.reshape(self.n_groups, n_labels)
+
+    def label_distribution(self, labels, n_labels=None, percent=True):
+        """Như label_counts nhưng chia cho kích thước nhóm (tỷ lệ %, hoặc [0, 1] khi percent=False)."""
+        counts = self.label_counts(labels, n_labels)
+        totals = np.maximum(counts.sum(axis=1, keepdims=True), 1)
+        return counts / totals * (100.0 if percent else 1.0)
+
+    # --- Tổng hợp bằng reduceat (cần sắp xếp theo nhóm) ---
+    def _sorted(self, values):
+        if self._order is None:
+            self._order = np.argsort(self.codes, kind='stable')
+            sizes = self.size()
+            self._starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            self._non_empty = sizes > 0
+        return self._values(values)[self._order]
+
+    def _reduceat(self, ufunc, values):
+        sorted_values = self._sorted(values)
+        dtype = sorted_values.dtype
+        # Nhóm rỗng (nếu có) nhận giá trị thiếu hợp với kiểu: NaT cho ngày giờ, nan cho số thực,
+        # cột số nguyên / bool chuyển sang float64 để chứa nan, kiểu khác -> object với None
+        if dtype.kind in 'mM':
+            fill = np.array('NaT', dtype=dtype)
+        elif dtype.kind in 'fc':
+            fill = np.nan
+        elif self._non_empty.all():
+            fill = None
+        elif dtype.kind in 'iub':
+            dtype, fill = np.dtype(np.float64), np.nan
+        else:
+            dtype, fill = np.dtype(object), None
+        out = np.empty(self.n_groups, dtype=dtype)
+        if fill is not None:
+            out[:] = fill
+        if len(sorted_values):
+            out[self._non_empty] = ufunc.reduceat(sorted_values, self._starts[self._non_empty])
+        return out
+
+    def min(self, values):
+        return self._reduceat(np.minimum, values)
+
+    def max(self, values):
+        return self._reduceat(np.maximum, values)
+
+    def agg(self, **specs):
+        """
+        Nhiều phép tổng hợp trong một lời gọi, trả về bảng (dict cột).
+        Ví dụ: gb.agg(count=(None, 'size'), avg_eng=(engagement, 'mean'))
+        """
+        table = self.key_table()
+        for name, (values, how) in specs.items():
+            table[name] = self.size() if how == 'size' else getattr(self, how)(values)
+        return table
+
+
+def sort_table(table, by, descending=False, top_k=None):
+    """Sắp xếp các cột của bảng theo cột `by` (ổn định), lấy top_k dòng đầu nếu có."""
+    key = np.asarray(table[by])
+    order = np.argsort(-key if descending else key, kind='stable')
+    if top_k is not None:
+        order = order[:top_k]
+    return {name: np.asarray(col)[order] for name, col in table.items()}
+
+
+# ================================================================================================
+# CÁC BẢNG PHÂN TÍCH TRONG NOTEBOOK 02
+# ================================================================================================
+def _add_sentiment_columns(table, gb, labels, percent):
+    dist = gb.label_distribution(labels, 3, percent) if percent else gb.label_counts(labels, 3)
+    for j, name in enumerate(SENTIMENT_COLUMNS):
+        table[name] = dist[:, j]
+    return table
+
+
+def sentiment_by(keys, labels, names=None, percent=True):
+    """
+    Phân bố cảm xúc theo nhóm (acc_class, user_verified, source, user_location, ...):
+    bảng gồm cột key, 'count', 'net_sentiment' (trung bình nhãn - 1), 'neg', 'neu', 'pos'.
+    """
+    labels = np.asarray(labels)
+    gb = GroupBy(keys, names)
+    table = gb.key_table()
+    table['count'] = gb.size()
+    table['net_sentiment'] = gb.mean(labels) - 1
+    return _add_sentiment_columns(table, gb, labels, percent)
+
+
+def daily_sentiment(dates, labels):
+    """
+    Thay cho vòng lặp defaultdict theo ngày: mỗi ngày một dòng, đã sắp theo ngày, gồm
+    'count', 'net_sentiment' (trung bình của nhãn - 1) và số tweet 'neg' / 'neu' / 'pos'.
+    """
+    return sentiment_by(truncate_day(dates), labels, names='date', percent=False)
+
+
+def hashtag_sentiment(hashtags, labels, min_count=1):
+    """Điểm cảm xúc trung bình (nhãn - 1) theo từng hashtag, chỉ giữ hashtag xuất hiện >= min_count lần."""
+    rows, tags = explode(hashtags)
+    if len(tags) == 0:
+        return {'hashtag': tags, 'count': np.empty(0, dtype=np.int64), 'net_sentiment': np.empty(0)}
+    scores = np.asarray(labels)[rows] - 1
+    gb = GroupBy(tags, names='hashtag')
+    table = gb.agg(count=(None, 'size'), net_sentiment=(scores, 'mean'))
+    keep = table['count'] >= min_count
+    return {name: col[keep] for name, col in table.items()}
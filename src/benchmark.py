@@ -0,0 +1,436 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.config import COMPREHENSIVE_MAPPING, EMOJI_MAP, NEGATION_WORDS, NEGATIVE_WORDS, POSITIVE_WORDS
+from src.data_processing import (clean_text, clean_text_fast, simple_stemmer, generate_sentiment_label,
+                                 improved_location_mapper, get_keywords, get_bigrams, generate_parity_corpus)
+from src.data_processing import check_clean_text_parity as _clean_text_mismatches
+from src.location import map_locations, normalize_location
+
+
+# ================================================================================================
+# SYNTHETIC TWEETS
+# ================================================================================================
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+_FILLER_WORDS = [
+    'the', 'a', 'is', 'was', 'and', 'to', 'of', 'my', 'i', 'we', 'they', 'today', 'got', 'first',
+    'second', 'dose', 'shot', 'arm', 'people', 'doctors', 'hospital', 'nurses', 'country', 'news',
+    'trial', 'results', 'approved', 'approval', 'distribution', 'rollout', 'waiting', 'getting',
+    'received', 'vaccinated', 'vaccines', 'vaccine', 'pfizer', 'biontech', 'covid', 'health',
+    'workers', 'week', 'tomorrow', 'finally', 'really', 'just', 'still', 'feeling', 'after',
+]
+_HASHTAGS = ['PfizerBioNTech', 'Pfizer', 'vaccine', 'COVID19', 'CovidVaccine', 'BioNTech',
+             'vaccination', 'Moderna', 'coronavirus', 'GetVaccinated']
+_SOURCES = ['Twitter for iPhone', 'Twitter for Android', 'Twitter Web App', 'TweetDeck', 'Hootsuite']
+
+
+def generate_tweets(n, seed=0):
+    """
+    Sinh n tweet giả lập có thể tái lập (cùng seed -> cùng dữ liệu), đủ các hiện tượng mà
+    clean_text / gán nhãn / map địa điểm phải xử lý: emoji trong EMOJI_MAP, URL, mention,
+    hashtag, từ trong POSITIVE/NEGATIVE_WORDS, từ phủ định, số, địa điểm trong COMPREHENSIVE_MAPPING.
+    Trả về dict cột: text, hashtags, user_location, date, user_verified, source, user_followers.
+    """
+    rng = np.random.default_rng(seed)
+    filler = np.array(_FILLER_WORDS)
+    positive = np.array(sorted(POSITIVE_WORDS))
+    negative = np.array(sorted(NEGATIVE_WORDS))
+    negation = np.array(sorted(NEGATION_WORDS))
+    emojis = np.array(sorted(EMOJI_MAP))
+    hashtags = np.array(_HASHTAGS)
+
+    n_words = rng.integers(5, 20, size=n)
+    texts = []
+    tag_col = []
+    for i in range(n):
+        parts = list(rng.choice(filler, n_words[i]))
+        # Từ cảm xúc, có thể đứng sau một từ phủ định
+        for _ in range(rng.integers(0, 3)):
+            word = rng.choice(positive) if rng.random() < 0.5 else rng.choice(negative)
+            pos = rng.integers(0, len(parts) + 1)
+            parts.insert(pos, word)
+            if rng.random() < 0.2:
+                parts.insert(pos, rng.choice(negation))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(emojis))
+        if rng.random() < 0.3:
+            parts.insert(0, f"@user{rng.integers(0, 5000)}")
+        if rng.random() < 0.1:
+            parts.append(f"{rng.integers(1, 100)}% of {rng.integers(1000, 9999)}")
+        tags = list(rng.choice(hashtags, rng.integers(0, 3), replace=False))
+        parts.extend('#' + t for t in tags)
+        if rng.random() < 0.4:
+            parts.append(f"https://t.co/{rng.integers(0, 1 << 40):x}")
+        texts.append(' '.join(parts))
+        tag_col.append(' '.join(tags) if tags else 'no_hashtag')
+
+    # Địa điểm: key trong mapping viết hoa/thường lẫn lộn, kèm chuỗi rác và giá trị rỗng
+    keys = np.array([k for k in COMPREHENSIVE_MAPPING if len(k) > 1])
+    kind = rng.random(n)
+    loc_keys = rng.choice(keys, n)
+    locations = np.where(kind < 0.6, np.char.add(np.char.title(loc_keys), ', somewhere'),
+                         np.where(kind < 0.8, '', np.char.add('planet ', rng.integers(0, 100, n).astype(str))))
+
+    start = np.datetime64('2020-12-12T00:00:00')
+    dates = start + rng.integers(0, 86400 * 90, size=n).astype('timedelta64[s]')
+    return {
+        'text': np.array(texts, dtype=str),
+        'hashtags': np.array(tag_col, dtype=str),
+        'user_location': locations,
+        'date': dates,
+        'user_verified': rng.random(n) < 0.1,
+        'source': rng.choice(np.array(_SOURCES), n),
+        'user_followers': rng.lognormal(5, 2, n).astype(np.int64),
+    }
+
+
+# ================================================================================================
+# BENCHMARKS
+# ================================================================================================
+class BenchContext:
+    """Dữ liệu dùng chung giữa các benchmark, chuẩn bị lười (không tính vào thời gian đo)."""
+
+    def __init__(self, n, seed=0):
+        self.n = n
+        self.seed = seed
+        self._cache = {}
+
+    def get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def data(self):
+        return self.get('data', lambda: generate_tweets(self.n, self.seed))
+
+    @property
+    def texts(self):
+        return self.data['text']
+
+    @property
+    def cleaned(self):
+        return self.get('cleaned', lambda: [clean_text_fast(t) for t in self.texts])
+
+    @property
+    def words(self):
+        return self.get('words', lambda: [w for t in self.texts[:max(1, self.n // 10)] for w in t.lower().split()])
+
+    @property
+    def normalized_locations(self):
+        return self.get('locations', lambda: [normalize_location(loc) for loc in self.data['user_location']])
+
+    @property
+    def features(self):
+        def build():
+            from src.features import HashingVectorizer
+            from src.corpus import generate_sentiment_labels
+            # MultinomialNB cần đặc trưng không âm -> tắt hashing có dấu
+            X = HashingVectorizer(n_features=1 << 14, alternate_sign=False).transform(self.cleaned)
+            return X, generate_sentiment_labels(self.cleaned)
+        return self.get('features', build)
+
+
+def _bench_clean_text(ctx):
+    for t in ctx.texts:
+        clean_text(t)
+    return len(ctx.texts)
+
+
+def _bench_clean_text_fast(ctx):
+    for t in ctx.texts:
+        clean_text_fast(t)
+    return len(ctx.texts)
+
+
+def _bench_stemmer(ctx):
+    for w in ctx.words:
+        simple_stemmer(w)
+    return len(ctx.words)
+
+
+def _bench_sentiment_label(ctx):
+    for t in ctx.cleaned:
+        generate_sentiment_label(t)
+    return len(ctx.cleaned)
+
+
+def _bench_location_mapper(ctx):
+    for loc in ctx.normalized_locations:
+        improved_location_mapper(loc, COMPREHENSIVE_MAPPING)
+    return len(ctx.normalized_locations)
+
+
+def _bench_map_locations(ctx):
+    map_locations(ctx.normalized_locations, normalize=False)
+    return len(ctx.normalized_locations)
+
+
+def _bench_keywords(ctx):
+    get_keywords(ctx.texts, 10)
+    return len(ctx.texts)
+
+
+def _bench_bigrams(ctx):
+    get_bigrams(ctx.texts, 15)
+    return len(ctx.texts)
+
+
+def _bench_lr_fit(ctx):
+    from src.models import LogisticRegression
+    X, y = ctx.features
+    ctx._cache['lr'] = LogisticRegression(learning_rate=0.1, n_iters=50, lambda_param=0.01).fit(X, y)
+    return X.shape[0]
+
+
+def _bench_lr_predict(ctx):
+    from src.models import LogisticRegression
+    X, y = ctx.features
+    model = ctx.get('lr', lambda: LogisticRegression(learning_rate=0.1, n_iters=50, lambda_param=0.01).fit(X, y))
+    model.predict(X)
+    return X.shape[0]
+
+
+def _bench_nb_fit(ctx):
+    from src.models import MultinomialNB
+    X, y = ctx.features
+    ctx._cache['nb'] = MultinomialNB().fit(X, y)
+    return X.shape[0]
+
+
+def _bench_nb_predict(ctx):
+    from src.models import MultinomialNB
+    X, y = ctx.features
+    ctx.get('nb', lambda: MultinomialNB().fit(X, y)).predict(X)
+    return X.shape[0]
+
+
+# Tên -> hàm đo (trả về số phần tử đã xử lý để tính throughput)
+BENCHMARKS = {
+    'clean_text': _bench_clean_text,
+    'clean_text_fast': _bench_clean_text_fast,
+    'simple_stemmer': _bench_stemmer,
+    'generate_sentiment_label': _bench_sentiment_label,
+    'improved_location_mapper': _bench_location_mapper,
+    'map_locations': _bench_map_locations,
+    'get_keywords': _bench_keywords,
+    'get_bigrams': _bench_bigrams,
+    'lr_fit': _bench_lr_fit,
+    'lr_predict': _bench_lr_predict,
+    'nb_fit': _bench_nb_fit,
+    'nb_predict': _bench_nb_predict,
+}
+
+
+def check_clean_text_parity(ctx, limit=20_000):
+    """
+    clean_text_fast phải cho kết quả giống hệt clean_text (data_processing.check_clean_text_parity)
+    trên tweet giả lập của benchmark lẫn corpus ngẫu nhiên của src.parity; trả về danh sách text lệch.
+    """
+    texts = list(ctx.texts[:limit]) + generate_parity_corpus(limit, ctx.seed)
+    return [text for text, _, _ in _clean_text_mismatches(texts)]
+
+
+def run_benchmark(fn, ctx, repeat=3, memory=True):
+    """Chạy `fn` `repeat` lần, lấy thời gian nhỏ nhất; đo peak memory (tracemalloc) ở một lần riêng."""
+    best = float('inf')
+    n_items = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n_items = fn(ctx)
+        best = min(best, time.perf_counter() - t0)
+
+    result = {'seconds': best, 'items': n_items, 'throughput': n_items / best if best > 0 else float('inf')}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn(ctx)
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_suite(scale='10k', only=None, repeat=3, memory=True, seed=0, log=print):
+    n = SCALES[scale] if isinstance(scale, str) else int(scale)
+    ctx = BenchContext(n, seed)
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        fn(ctx)  # chạy nóng + chuẩn bị dữ liệu phụ thuộc
+        results[name] = run_benchmark(fn, ctx, repeat, memory)
+        r = results[name]
+        log(f"{name:<26} {r['throughput']:>14,.0f} items/s  {r['seconds']:>9.3f} s"
+            + (f"  peak {r['peak_mb']:>8.1f} MB" if 'peak_mb' in r else ''))
+    return ctx, results
+
+
+# ================================================================================================
+# IMPORT TIME (headless)
+# ================================================================================================
+# Các module xử lý văn bản / mô hình phải import được chỉ với NumPy: không kéo theo thư viện vẽ
+# hay scikit-learn (phần vẽ nằm trong src.visualization, chỉ nạp khi notebook import nó).
+HEADLESS_MODULES = ('src', 'src.config', 'src.data_processing', 'src.models', 'src.features',
+                    'src.corpus', 'src.location', 'src.aggregation', 'src.sketches', 'src.index',
+                    'src.ingest', 'src.storage', 'src.cache', 'src.dedup', 'src.instrumentation',
+                    'src.serving', 'src.pipeline', 'src.model_selection', 'src.parity')
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'sklearn', 'scipy', 'pandas')
+IMPORT_BUDGET_MS = 1000
+
+_IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+seconds = time.perf_counter() - t0
+print(json.dumps({{'seconds': seconds, 'heavy': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure_import_time(modules=HEADLESS_MODULES, repeat=3):
+    """
+    Đo thời gian import `modules` trong process Python mới (không bị cache bởi process hiện tại),
+    lấy lần nhanh nhất. Trả về {'ms': ..., 'heavy': [thư viện nặng bị nạp theo]}.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _IMPORT_PROBE.format(modules=tuple(modules), heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], cwd=project_root, capture_output=True,
+                             text=True, check=True)
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or probe['seconds'] < best['seconds']:
+            best = probe
+    return {'ms': best['seconds'] * 1000, 'heavy': best['heavy']}
+
+
+def check_import_budget(budget_ms=IMPORT_BUDGET_MS, modules=HEADLESS_MODULES):
+    """Trả về (kết quả đo, danh sách lỗi): vượt ngân sách thời gian hoặc nạp thư viện nặng."""
+    result = measure_import_time(modules)
+    errors = []
+    if result['ms'] > budget_ms:
+        errors.append(f"import mất {result['ms']:.0f} ms > ngân sách {budget_ms:.0f} ms")
+    if result['heavy']:
+        errors.append("import kéo theo thư viện nặng: " + ", ".join(result['heavy']))
+    return result, errors
+
+
+# ================================================================================================
+# BASELINE
+# ================================================================================================
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, scale, results):
+    baseline = load_baseline(path)
+    baseline[scale] = {name: {'throughput': r['throughput'], **({'peak_mb': r['peak_mb']} if 'peak_mb' in r else {})}
+                       for name, r in results.items()}
+    baseline.setdefault('_meta', {})[scale] = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'recorded': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2, memory_tolerance=0.5):
+    """
+    Trả về danh sách thông báo regression: throughput thấp hơn baseline quá `tolerance`
+    (tỷ lệ), hoặc peak memory cao hơn quá `memory_tolerance`.
+    """
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = r['throughput'] / base['throughput']
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: throughput {r['throughput']:,.0f}/s = {ratio:.2f}x baseline "
+                               f"({base['throughput']:,.0f}/s)")
+        if 'peak_mb' in r and 'peak_mb' in base and base['peak_mb'] > 1:
+            mem_ratio = r['peak_mb'] / base['peak_mb']
+            if mem_ratio > 1 + memory_tolerance:
+                regressions.append(f"{name}: peak memory {r['peak_mb']:.1f} MB = {mem_ratio:.2f}x baseline "
+                                   f"({base['peak_mb']:.1f} MB)")
+    return regressions
+
+
+# ================================================================================================
+# CLI: python -m src.benchmark --scale 100k --baseline benchmarks/baseline.json
+# ================================================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các hot path trên tweet giả lập")
+    parser.add_argument('--scale', default='10k', choices=sorted(SCALES))
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), help="chỉ chạy các benchmark này")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="bỏ đo peak memory (chạy nhanh hơn)")
+    parser.add_argument('--baseline', help="file JSON baseline để so sánh")
+    parser.add_argument('--save-baseline', action='store_true', help="ghi kết quả lần này làm baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="mức giảm throughput cho phép (0.2 = 20%%)")
+    parser.add_argument('--output', help="ghi kết quả chi tiết ra file JSON")
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help="thời gian import tối đa của các module headless (ms)")
+    args = parser.parse_args(argv)
+
+    print(f"Benchmark scale={args.scale} ({SCALES[args.scale]:,} tweet), seed={args.seed}")
+    ctx, results = run_suite(args.scale, args.only, args.repeat, not args.no_memory, args.seed)
+
+    failed = False
+    mismatches = check_clean_text_parity(ctx)
+    if mismatches:
+        failed = True
+        print(f"\nLỖI: clean_text_fast khác clean_text trên {len(mismatches)} tweet, ví dụ: {mismatches[0]!r}")
+
+    import_result, import_errors = check_import_budget(args.import_budget_ms)
+    print(f"\nImport headless: {import_result['ms']:.0f} ms (ngân sách {args.import_budget_ms:.0f} ms)")
+    if import_errors:
+        failed = True
+        for msg in import_errors:
+            print("LỖI: " + msg)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'results': results, 'import_ms': import_result['ms']}, f, indent=2)
+
+    if args.baseline:
+        if args.save_baseline:
+            save_baseline(args.baseline, args.scale, results)
+            print(f"\nĐã lưu baseline vào {args.baseline}")
+        else:
+            baseline = load_baseline(args.baseline).get(args.scale)
+            if baseline is None:
+                print(f"\nCảnh báo: {args.baseline} chưa có baseline cho scale {args.scale}")
+            else:
+                regressions = compare_to_baseline(results, baseline, args.tolerance)
+                if regressions:
+                    failed = True
+                    print("\nREGRESSION so với baseline:")
+                    for msg in regressions:
+                        print("  - " + msg)
+                else:
+                    print("\nKhông có regression so với baseline.")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+import src.instrumentation as instrumentation
+from src.storage import SCHEMA_FILE, append_columns, load_columns, save_columns
+
+
+# ================================================================================================
+# HASH
+# ================================================================================================
+def _canonical(value):
+    """Đưa config về dạng JSON ổn định (set -> list đã sắp xếp, dict giữ thứ tự vì thứ tự có ý nghĩa)."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(v) for v in value)
+    if isinstance(value, dict):
+        # Thứ tự key của COMPREHENSIVE_MAPPING / EMOJI_MAP quyết định kết quả -> giữ dạng list cặp
+        return [[_canonical(k), _canonical(v)] for k, v in value.items()]
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def hash_config(value):
+    """sha256 (hex) của một config bất kỳ gồm dict / list / set / số / chuỗi."""
+    payload = json.dumps(_canonical(value), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def hash_values(values):
+    """Hash 64 bit (blake2b) của từng giá trị thô -> mảng uint64, dùng để phát hiện dòng bị sửa."""
+    out = np.empty(len(values), dtype=np.uint64)
+    for i, v in enumerate(values):
+        if not isinstance(v, bytes):
+            v = str(v).encode('utf-8')
+        out[i] = int.from_bytes(hashlib.blake2b(v, digest_size=8).digest(), 'little')
+    return out
+
+
+# ================================================================================================
+# ROW CACHE
+# ================================================================================================
+# Cấu trúc thư mục:
+#   <path>/<version[:16]>/   -> store cột (src.storage): id (int64), key_hash (uint64), các cột kết quả
+# version = hash của config/từ điển: đổi từ điển -> thư mục mới, kết quả cũ tự hết hiệu lực.
+# Dòng mới được append vào cuối store; cùng id xuất hiện nhiều lần thì bản ghi sau cùng được dùng.
+class RowCache:
+    """
+    Bảng kết quả theo từng dòng trên đĩa, key = (tweet id, hash giá trị thô), để một lần chạy
+    trên bản dump mới chỉ phải tính các tweet mới hoặc bị sửa:
+
+        cache = RowCache('data/cache/clean', version=hash_config(config), columns=['clean_text'])
+        out = cache.apply(ids, texts, lambda texts: {'clean_text': clean_texts(texts)})
+        print(cache.hit_ratio)
+    """
+
+    def __init__(self, path, version, columns, prune=True):
+        self.path = path
+        self.version = version
+        self.columns = list(columns)
+        self.dir = os.path.join(path, version[:16])
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        if prune:
+            self.prune()
+
+    # --- Tra cứu ---
+    def __len__(self):
+        if not os.path.exists(os.path.join(self.dir, SCHEMA_FILE)):
+            return 0
+        return len(load_columns(self.dir, ['id'])['id'])
+
+    def _load_index(self):
+        if self._index is None:
+            if not os.path.exists(os.path.join(self.dir, SCHEMA_FILE)):
+                empty = np.empty(0, dtype=np.int64)
+                self._index = (empty, empty.astype(np.uint64), empty)
+            else:
+                stored = load_columns(self.dir, ['id', 'key_hash'])
+                ids = np.asarray(stored['id'])
+                # Sắp theo (id, vị trí ghi) rồi giữ bản ghi cuối cùng của mỗi id
+                order = np.lexsort((np.arange(len(ids)), ids))
+                sorted_ids = ids[order]
+                last = np.ones(len(order), dtype=bool)
+                last[:-1] = sorted_ids[1:] != sorted_ids[:-1]
+                rows = order[last]
+                self._index = (sorted_ids[last], np.asarray(stored['key_hash'])[rows], rows)
+        return self._index
+
+    def lookup(self, ids, hashes):
+        """Vị trí trong store của từng (id, hash), -1 nếu chưa có hoặc nội dung đã đổi."""
+        ids = np.asarray(ids, dtype=np.int64)
+        cached_ids, cached_hashes, rows = self._load_index()
+        if len(cached_ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(cached_ids, ids), len(cached_ids) - 1)
+        found = (cached_ids[pos] == ids) & (cached_hashes[pos] == hashes)
+        return np.where(found, rows[pos], -1)
+
+    def get(self, rows):
+        """Giá trị các cột kết quả tại các vị trí `rows` của store."""
+        stored = load_columns(self.dir, self.columns)
+        return {name: stored[name][rows] for name in self.columns}
+
+    # --- Ghi ---
+    def put(self, ids, hashes, results):
+        append_columns(self.dir, {'id': np.asarray(ids, dtype=np.int64),
+                                  'key_hash': np.asarray(hashes, dtype=np.uint64),
+                                  **{name: results[name] for name in self.columns}})
+        self._index = None
+
+    def compact(self):
+        """Ghi lại store, chỉ giữ bản ghi mới nhất của mỗi id."""
+        cached_ids, cached_hashes, rows = self._load_index()
+        if len(rows) == len(self):
+            return
+        rows = np.sort(rows)
+        stored = load_columns(self.dir)
+        data = {name: stored[name][rows] for name in ['id', 'key_hash'] + self.columns}
+        save_columns(self.dir, data)
+        self._index = None
+
+    def prune(self):
+        """Xoá các version cũ (config/từ điển đã đổi) để bảng trên đĩa luôn gọn."""
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if name != os.path.basename(self.dir):
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    # --- Tính có cache ---
+    def apply(self, ids, values, compute):
+        """
+        Kết quả của `compute` cho từng dòng, theo đúng thứ tự đầu vào.
+        - ids: tweet id; values: giá trị thô (text, location...) được hash để phát hiện dòng bị sửa
+        - compute(list giá trị thô chưa có trong cache) -> dict {tên cột: mảng kết quả}
+        Đầu vào rỗng vẫn trả về đủ các cột (mảng rỗng, kiểu lấy từ compute([])).
+        """
+        values = list(values)
+        ids = np.asarray(ids, dtype=np.int64)
+        if not values:
+            computed = compute([])
+            out = {}
+            for name in self.columns:
+                col = np.asarray(computed[name])[:0]
+                out[name] = col.astype(object) if col.dtype.kind == 'U' else col
+            return out
+        hashes = hash_values(values)
+        rows = self.lookup(ids, hashes)
+        hit = rows >= 0
+        miss = np.flatnonzero(~hit)
+        n_hits = int(hit.sum())
+
+        out = {}
+        if n_hits:
+            for name, col in self.get(rows[hit]).items():
+                out[name] = np.empty(len(values), dtype=object if col.dtype.kind == 'U' else col.dtype)
+                out[name][hit] = col
+        if len(miss):
+            computed = compute([values[i] for i in miss])
+            for name in self.columns:
+                col = np.asarray(computed[name])
+                if name not in out:
+                    out[name] = np.empty(len(values), dtype=object if col.dtype.kind in 'UO' else col.dtype)
+                out[name][miss] = col
+            self.put(ids[miss], hashes[miss], {name: np.asarray(computed[name]) for name in self.columns})
+            # Bản ghi cũ bị thay thế chiếm quá nửa store -> ghi gọn lại
+            if len(self) > 2 * len(self._load_index()[0]):
+                self.compact()
+
+        self.hits += n_hits
+        self.misses += len(miss)
+        instrumentation.count('row_cache_hits', n_hits)
+        instrumentation.count('row_cache_misses', len(miss))
+        return out
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hit_ratio}
@@ -1,9 +1,8 @@
 # ================================
 # GLOBAL IMPORT 
 # ================================
+# Chỉ dùng thư viện chuẩn + NumPy: matplotlib/seaborn được import trong src.visualization
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import Counter # đếm số lượng
 import re # sử dụng trong xử lý file
 from numpy.lib import recfunctions as rfn # lưu trường (cột) mới vào trong data
@@ -16,11 +15,7 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-
-# --- Cài đặt cấu hình trực quan hóa ---
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (10, 6)
-plt.rcParams['font.size'] = 12
+# Cấu hình trực quan hóa (seaborn style, rcParams): xem src/visualization.py
 
 
 # ================================
@@ -50,12 +45,15 @@ COMPREHENSIVE_MAPPING = {
     'unknown': "unknown_location" 
 }
 
+# Giá trị gán cho location bị thiếu
+IMPUTE_LOCATION = 'unknown_location'
+
 
 # ================================
 # TEXT
 # ================================
-# 1. Cấu hình Emoji & Từ điển (Dữ liệu nền tảng)
-POSITIVE_WORDS = {
+# 1. Cấu hình Emoji & Từ điển (Dữ liệu nền tảng, frozenset: không sửa được lúc chạy)
+POSITIVE_WORDS = frozenset({
     'good', 'great', 'excellent', 'amazing', 'wonderful', 'best', 'love', 'safe', 
     'effective', 'thanks', 'thankful', 'grateful', 'hope', 'success', 'happy', 
     'protection', 'relief', 'excited', 'glad', 'perfect', 'awesome', 'better',
@@ -84,9 +82,9 @@ POSITIVE_WORDS = {
     # 6. Nhóm Từ cảm thán/Slang (Thường gặp trên Twitter/MXH)
     'yay', 'hurray', 'woohoo', 'bravo', 'kudos', 'cheers', 
     'cool', 'nice', 'lovely', 'pleasant', 'enjoy', 'enjoyed'
-}
+})
 
-NEGATIVE_WORDS = {
+NEGATIVE_WORDS = frozenset({
     'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'dangerous', 'risk',
     'fear', 'scared', 'fail', 'failed', 'death', 'sick', 'pain', 'hurt', 'harm', 
     'useless', 'fake', 'scam', 'problem', 'severe', 'worry', 'sad',
@@ -112,7 +110,7 @@ NEGATIVE_WORDS = {
     # 5. Nhóm Giận dữ & Phản đối
     'angry', 'furious', 'annoyed', 'annoying', 'mad', 'upset', 'frustrated',
     'complain', 'complaint', 'hell', 'damn', 'wtf', 'ridiculous', 'crazy'
-}
+})
 
 EMOJI_MAP = {
     # Tích cực (Positive)
@@ -147,7 +145,7 @@ EMOJI_MAP = {
     # Khác
     "📢": "announce", "🚨": "alert", "🤔": "thinking"
 }
-NEGATION_WORDS = {
+NEGATION_WORDS = frozenset({
     # Phủ định cơ bản
     'not', 'no', 'never', 'none', 'nobody', 'nothing', 'neither', 'nor', 'nowhere',
     
@@ -174,7 +172,7 @@ NEGATION_WORDS = {
     # Từ mang nghĩa phủ định ngữ cảnh (Contextual negations)
     'without', 'lack', 'missing',
     'barely', 'hardly', 'scarcely', 'rarely'
-}
+})
 
 # Nguyên âm dùng để kiểm tra
 VOWELS = np.array(list("aeiou"))
@@ -182,7 +180,18 @@ VOWELS = np.array(list("aeiou"))
 # ================================
 # PATH
 # ================================
-FILE_PATH_PROCESSED_MISSING_SENTIMENT = r'..\data\processed\processed_missing_sentiment.npy'
-FILE_PATH_SENTIMENT = r'../data/processed/sentiment_data.npz' 
-FILE_PATH_VACCINENATION_TWEETS = r"..\data\raw\vaccination_tweets.csv" 
-FILE_PATH_CLEANED_VACCINENATION_TWEETS  = r"..\data\raw\pfizer_tweets_clean.csv" 
+# Đường dẫn tính từ thư mục gốc của project bằng os.path.join -> chạy được trên mọi hệ điều hành
+# và không phụ thuộc thư mục hiện tại (notebook trong notebooks/ hay `python -m src.pipeline` ở gốc)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, 'data')
+
+FILE_PATH_PROCESSED_MISSING_SENTIMENT = os.path.join(DATA_DIR, 'processed', 'processed_missing_sentiment.npy')
+FILE_PATH_SENTIMENT = os.path.join(DATA_DIR, 'processed', 'sentiment_data.npz')
+FILE_PATH_VACCINENATION_TWEETS = os.path.join(DATA_DIR, 'raw', 'vaccination_tweets.csv')
+
+# Thư mục columnar (memory-map) thay cho file .npy/.npz ở trên -> xem src/storage.py
+DIR_PATH_PROCESSED_MISSING_SENTIMENT = os.path.join(DATA_DIR, 'processed', 'processed_missing_sentiment')
+DIR_PATH_SENTIMENT = os.path.join(DATA_DIR, 'processed', 'sentiment_data')
+
+# Kết quả từng stage của src.pipeline (mỗi stage một thư mục con theo hash đầu vào)
+DIR_PATH_PIPELINE = os.path.join(DATA_DIR, 'pipeline')
@@ -0,0 +1,222 @@
+import numpy as np
+
+from src.config import POSITIVE_WORDS, NEGATIVE_WORDS, NEGATION_WORDS
+from src.data_processing import MY_STOP_WORDS
+
+
+# ================================================================================================
+# TOKEN CORPUS (CSR)
+# ================================================================================================
+class TokenCorpus:
+    """
+    Toàn bộ tập tweet sau khi tách từ MỘT lần:
+    - vocab: list từ vựng, token id = vị trí trong vocab
+    - tokens: mảng int32 phẳng chứa id của mọi từ (nối liền các tweet)
+    - offsets: int64 độ dài n_docs + 1, tweet i = tokens[offsets[i]:offsets[i+1]]
+
+    Các từ điển (stopword, tích cực/tiêu cực, phủ định) được tính sẵn thành mảng tra cứu
+    theo vocab nên việc đếm từ / bigram chỉ còn là np.bincount trên mảng id.
+    """
+
+    def __init__(self, vocab, tokens, offsets):
+        self.vocab = list(vocab)
+        self.vocab_index = {w: i for i, w in enumerate(self.vocab)}
+        self.tokens = np.asarray(tokens, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._lookups = {}
+
+    @classmethod
+    def from_texts(cls, texts, tokenizer=str.split):
+        """
+        Tách từ từng tweet bằng `tokenizer` và intern thành id.
+        - tokenizer: mặc định str.split (cho output của clean_text);
+          dùng keyword_tokens / bigram_tokens để khớp với get_keywords / get_bigrams
+        """
+        vocab_index = {}
+        ids = []
+        offsets = [0]
+        for t in texts:
+            if isinstance(t, bytes):
+                t = t.decode('utf-8')
+            for w in tokenizer(t):
+                idx = vocab_index.get(w)
+                if idx is None:
+                    idx = vocab_index[w] = len(vocab_index)
+                ids.append(idx)
+            offsets.append(len(ids))
+
+        return cls(list(vocab_index), np.array(ids, dtype=np.int32), np.array(offsets, dtype=np.int64))
+
+    # --- Kích thước ---
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def n_docs(self):
+        return len(self)
+
+    @property
+    def vocab_size(self):
+        return len(self.vocab)
+
+    def doc(self, i):
+        """Danh sách từ của tweet thứ i."""
+        return [self.vocab[t] for t in self.tokens[self.offsets[i]:self.offsets[i + 1]]]
+
+    def doc_lengths(self):
+        return np.diff(self.offsets)
+
+    def doc_ids(self):
+        """Với mỗi token, trả về chỉ số tweet chứa nó."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.doc_lengths())
+
+    # --- Bảng tra cứu theo vocab ---
+    def lexicon_mask(self, words):
+        """Mảng bool (vocab_size,): từ nào thuộc tập `words`."""
+        return np.fromiter((w in words for w in self.vocab), dtype=bool, count=self.vocab_size)
+
+    def _lookup(self, name, build):
+        arr = self._lookups.get(name)
+        if arr is None or len(arr) != self.vocab_size:
+            arr = self._lookups[name] = build()
+        return arr
+
+    @property
+    def is_stop_word(self):
+        return self._lookup('stop', lambda: self.lexicon_mask(MY_STOP_WORDS))
+
+    @property
+    def is_negation(self):
+        return self._lookup('negation', lambda: self.lexicon_mask(NEGATION_WORDS))
+
+    @property
+    def polarity(self):
+        """int8 (vocab_size,): +1 từ tích cực, -1 từ tiêu cực, 0 còn lại (giống generate_sentiment_label)."""
+        def build():
+            pol = np.zeros(self.vocab_size, dtype=np.int8)
+            pol[self.lexicon_mask(NEGATIVE_WORDS)] = -1
+            pol[self.lexicon_mask(POSITIVE_WORDS)] = 1  # positive được xét trước trong hàm gốc
+            return pol
+        return self._lookup('polarity', build)
+
+    @property
+    def token_lengths(self):
+        return self._lookup('length', lambda: np.fromiter((len(w) for w in self.vocab),
+                                                           dtype=np.int32, count=self.vocab_size))
+
+    # --- Chọn tập con ---
+    def select(self, rows=None):
+        """
+        Gom token của các tweet trong `rows` (mảng chỉ số hoặc mask bool).
+        Trả về (tokens, doc_ids) theo đúng thứ tự của `rows`.
+        """
+        if rows is None:
+            return self.tokens, self.doc_ids()
+
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        rows = rows.astype(np.int64, copy=False)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+
+        # Chỉ số token = start của tweet + vị trí trong tweet
+        out_starts = np.cumsum(lengths) - lengths
+        idx = np.arange(total, dtype=np.int64) + np.repeat(starts - out_starts, lengths)
+        return self.tokens[idx], np.repeat(rows, lengths)
+
+    def _filtered(self, rows, min_len, stop_words):
+        tokens, docs = self.select(rows)
+        keep = self.token_lengths[tokens] >= min_len
+        if stop_words is None:
+            keep &= ~self.is_stop_word[tokens]
+        else:
+            keep &= ~self.lexicon_mask(stop_words)[tokens]
+        return tokens[keep], docs[keep]
+
+    # --- Đếm ---
+    def count(self, rows=None):
+        """Tần suất mỗi token id trên tập con `rows`."""
+        tokens, _ = self.select(rows)
+        return np.bincount(tokens, minlength=self.vocab_size)
+
+    @staticmethod
+    def _most_common(keys, top_k):
+        # Giống Counter.most_common: đếm giảm dần, hoà thì theo thứ tự xuất hiện đầu tiên
+        if len(keys) == 0:
+            return np.empty(0, dtype=keys.dtype), np.empty(0, dtype=np.int64)
+        uniq, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        order = np.lexsort((first, -counts))[:top_k]
+        return uniq[order], counts[order]
+
+    def top_keywords(self, rows=None, top_k=10, min_len=4, stop_words=None):
+        """
+        Tương đương get_keywords (khi corpus được tạo với tokenizer=keyword_tokens):
+        bỏ stopword, giữ từ có độ dài >= min_len, trả về [(từ, số lần), ...].
+        """
+        tokens, _ = self._filtered(rows, min_len, stop_words)
+        ids, counts = self._most_common(tokens, top_k)
+        return [(self.vocab[i], int(c)) for i, c in zip(ids, counts)]
+
+    def top_bigrams(self, rows=None, top_k=15, min_len=3, stop_words=None):
+        """
+        Tương đương get_bigrams (khi corpus được tạo với tokenizer=bigram_tokens):
+        bigram là 2 từ liền nhau (sau khi lọc) trong CÙNG một tweet.
+        """
+        tokens, docs = self._filtered(rows, min_len, stop_words)
+        same_doc = docs[1:] == docs[:-1]
+        keys = tokens[:-1][same_doc].astype(np.int64) * self.vocab_size + tokens[1:][same_doc]
+        pairs, counts = self._most_common(keys, top_k)
+        return [(f"{self.vocab[p // self.vocab_size]} {self.vocab[p % self.vocab_size]}", int(c))
+                for p, c in zip(pairs, counts)]
+
+    # --- Gán nhãn cảm xúc (vector hoá) ---
+    def sentiment_scores(self):
+        """
+        Điểm cảm xúc của từng tweet, giống hệt vòng lặp trong generate_sentiment_label:
+        mỗi từ đóng góp polarity (+1/-1/0), bị đảo dấu nếu từ ĐỨNG TRƯỚC trong cùng tweet là từ phủ định.
+        """
+        tokens = self.tokens
+        values = self.polarity[tokens].astype(np.int32)
+
+        # Mask phủ định dịch sang phải 1 vị trí, không được vượt qua ranh giới tweet
+        negated = np.zeros(len(tokens), dtype=bool)
+        negated[1:] = self.is_negation[tokens[:-1]]
+        lengths = self.doc_lengths()
+        non_empty = lengths > 0
+        negated[self.offsets[:-1][non_empty]] = False
+        values[negated] *= -1
+
+        scores = np.zeros(len(self), dtype=np.int32)
+        if len(values) > 0:
+            # reduceat chỉ trên các tweet có từ (tweet rỗng giữ điểm 0)
+            scores[non_empty] = np.add.reduceat(values, self.offsets[:-1][non_empty])
+        return scores
+
+    def sentiment_labels(self, threshold=0):
+        """Nhãn 0 (neg) / 1 (neu) / 2 (pos) cho toàn bộ corpus."""
+        return labels_from_scores(self.sentiment_scores(), threshold)
+
+
+def labels_from_scores(scores, threshold=0):
+    """score > threshold -> 2, score < -threshold -> 0, còn lại -> 1 (threshold=0 giống generate_sentiment_label)."""
+    scores = np.asarray(scores)
+    labels = np.ones(len(scores), dtype=np.int64)
+    labels[scores > threshold] = 2
+    labels[scores < -threshold] = 0
+    return labels
+
+
+def generate_sentiment_labels(texts, return_scores=False):
+    """
+    Phiên bản batch của generate_sentiment_label.
+    - texts: list/mảng text đã clean_text, hoặc một TokenCorpus có sẵn (tách bằng str.split)
+    - return_scores=True: trả thêm mảng điểm thô để đặt ngưỡng khác mà không cần tính lại
+    """
+    corpus = texts if isinstance(texts, TokenCorpus) else TokenCorpus.from_texts(texts)
+    scores = corpus.sentiment_scores()
+    labels = labels_from_scores(scores)
+    return (labels, scores) if return_scores else labels
@@ -1,4 +1,6 @@
-from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from src.stopwords import ENGLISH_STOP_WORDS  # bản sao của sklearn, không cần import scikit-learn
+from collections import OrderedDict
+from functools import partial
 import os 
 import sys
 
@@ -9,16 +11,8 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from src.config import *
-
-
-# ================================================================================================
-# Process Raw File 
-# ================================================================================================
-#Thay dấu phẩy trong "..." thành `;` 
-def replace_commas(match):
-    inner = match.group(0)[1:-1]      # bỏ dấu "
-    inner = inner.replace(",", ";")   # thay đổi
-    return f'"{inner}"'
+from src.storage import save_columns, load_columns
+import src.instrumentation as instrumentation
 
 
 # ================================================================================================
@@ -73,50 +67,94 @@ def count_mentions(text):
 # ================================================================================================
 # TEXT PROCESS
 # ================================================================================================
-MY_STOP_WORDS = set(ENGLISH_STOP_WORDS).union({
+MY_STOP_WORDS = ENGLISH_STOP_WORDS.union({
     'https', 'http', 'com', 'www', 'twitter', 'pic', 'status', # Rác link
     'pfizer', 'vaccine', 'covid', 'covid19', 'biontech' # Từ khóa chủ đề (xuất hiện quá nhiều nên lọc bỏ để thấy cái khác)
 })
 
-def get_keywords(text_arr, top_k=10):
-    all_words = []
-    for t in text_arr:
-        # 1. Xử lý byte string nếu cần
-        if isinstance(t, bytes):
-            t = t.decode('utf-8')
+def keyword_tokens(t):
+    """Tách từ cho get_keywords (chữ thường, chỉ lấy \\w+)."""
+    # 1. Xử lý byte string nếu cần
+    if isinstance(t, bytes):
+        t = t.decode('utf-8')
+    else:
+        t = str(t)
+
+    # 2. Tách từ đơn giản bằng Regex (chỉ lấy chữ cái/số)
+    # \w+ lấy các ký tự chữ và số, bỏ qua dấu câu
+    return re.findall(r'\w+', t.lower())
+
+
+def bigram_tokens(t):
+    """Tách từ cho get_bigrams (bỏ link, chỉ giữ a-z)."""
+    if isinstance(t, bytes): t = t.decode('utf-8')
+    # Làm sạch cơ bản
+    t = re.sub(r'http\S+', '', str(t).lower())
+    t = re.sub(r'[^a-z\s]', '', t)
+    return t.split()
+
+
+def keyword_items(t):
+    """Các từ được get_keywords đếm trong một tweet: không phải stopword VÀ độ dài > 3."""
+    return [w for w in keyword_tokens(t) if w not in MY_STOP_WORDS and len(w) > 3]
+
+
+def bigram_items(t):
+    """Các bigram được get_bigrams đếm trong một tweet (2 từ liền nhau sau khi lọc)."""
+    words = [w for w in bigram_tokens(t) if w not in MY_STOP_WORDS and len(w) > 2]
+    return [f"{words[i]} {words[i+1]}" for i in range(len(words) - 1)]
+
+
+# Dưới ngưỡng này (số tweet) method='auto' đếm chính xác bằng Counter
+SKETCH_MIN_ITEMS = 50_000
+SKETCH_CHUNKSIZE = 5000
+
+
+def _count_chunk(chunk, items_fn, method='exact', capacity=None):
+    # Mỗi chunk trả về một bộ đếm riêng (Counter hoặc sketch) để gộp lại sau
+    items = (x for t in chunk for x in items_fn(t))
+    if method == 'exact':
+        return [Counter(items)]
+    from src.sketches import SKETCHES
+    return [SKETCHES[method](capacity).update(items)]
+
+
+def _top_items(text_arr, items_fn, top_k, method='auto', capacity=None, workers=1):
+    """
+    Đếm phần tử do items_fn sinh ra trên từng chunk tweet rồi gộp các bộ đếm.
+    - method: 'exact' (Counter, kết quả giống hệt cách gốc), 'spacesaving', 'countmin',
+      'auto' = exact với input nhỏ (< SKETCH_MIN_ITEMS tweet), spacesaving với input lớn
+    - capacity: số phần tử tối đa sketch giữ lại (mặc định max(1000, 100 * top_k))
+    - workers: số process đếm song song (mỗi process đếm một shard, sau đó merge)
+    """
+    if method == 'auto':
+        small = hasattr(text_arr, '__len__') and len(text_arr) < SKETCH_MIN_ITEMS
+        method = 'exact' if small else 'spacesaving'
+    if method not in ('exact', 'spacesaving', 'countmin'):
+        raise ValueError(f"method không hợp lệ: {method!r}")
+    if capacity is None:
+        capacity = max(1000, 100 * top_k)
+
+    total = None
+    for part in _map_chunks(partial(_count_chunk, items_fn=items_fn, method=method, capacity=capacity),
+                            text_arr, workers, SKETCH_CHUNKSIZE):
+        if total is None:
+            total = part
+        elif method == 'exact':
+            # Counter.update giữ thứ tự xuất hiện đầu tiên -> hoà điểm xếp giống cách gốc
+            total.update(part)
         else:
-            t = str(t)
-            
-        # 2. Tách từ đơn giản bằng Regex (chỉ lấy chữ cái/số)
-        # \w+ lấy các ký tự chữ và số, bỏ qua dấu câu
-        w_list = re.findall(r'\w+', t.lower())
-        
-        # 3. Lọc từ: Không nằm trong stop words VÀ độ dài > 3
-        filtered_words = [w for w in w_list if w not in MY_STOP_WORDS and len(w) > 3]
-        
-        all_words.extend(filtered_words)
-    
-    # 4. Đếm và trả về top K
-    return Counter(all_words).most_common(top_k)
+            total.merge(part)
+    return total.most_common(top_k) if total is not None else []
 
-#  Hàm sinh Bigrams
-def get_bigrams(text_arr, top_k=15):
 
-    
-    all_bigrams = []
-    for t in text_arr:
-        if isinstance(t, bytes): t = t.decode('utf-8')
-        # Làm sạch cơ bản
-        t = re.sub(r'http\S+', '', str(t).lower())
-        t = re.sub(r'[^a-z\s]', '', t)
-        words = [w for w in t.split() if w not in MY_STOP_WORDS and len(w) > 2]
-        
-        # Tạo bigram
-        if len(words) >= 2:
-            for i in range(len(words)-1):
-                all_bigrams.append(f"{words[i]} {words[i+1]}")
-                
-    return Counter(all_bigrams).most_common(top_k)
+def get_keywords(text_arr, top_k=10, method='auto', capacity=None, workers=1):
+    # Tách từ, lọc stopword / từ ngắn (keyword_items), đếm và trả về top K
+    return _top_items(text_arr, keyword_items, top_k, method, capacity, workers)
+
+#  Hàm sinh Bigrams
+def get_bigrams(text_arr, top_k=15, method='auto', capacity=None, workers=1):
+    return _top_items(text_arr, bigram_items, top_k, method, capacity, workers)
 def is_basic_vowel(ch: str) -> bool:
     """Kiểm tra nguyên âm cơ bản (a, e, i, o, u)"""
     return ch in "aeiou"
@@ -227,6 +265,22 @@ def cvc(word: str) -> bool:
            c2 not in "wxy"
 
 
+# Bảng hậu tố của Step 2 (tạo một lần thay vì mỗi lần gọi simple_stemmer)
+STEP2_SUFFIX_MAP = {
+    "ational": "ate",
+    "tional": "tion",
+    "izer": "ize",
+    "alism": "al",
+    "aliti": "al",
+    "fullness": "ful",
+    "ousness": "ous",
+    "iveness": "ive",
+    "biliti": "ble",
+    "enci": "ence",
+    "anci": "ance",
+    "logi": "log"
+}
+
 def simple_stemmer(word: str) -> str:
     word = word.lower()
 
@@ -294,24 +348,7 @@ def simple_stemmer(word: str) -> str:
                 word += "e"
 
     # --- Step 2: Xử lý hậu tố phức tạp (Yêu cầu m > 0) ---
-    m_current = calculate_m(word)
-    
-    suffix_map = {
-        "ational": "ate",
-        "tional": "tion",
-        "izer": "ize",
-        "alism": "al",
-        "aliti": "al",
-        "fullness": "ful",
-        "ousness": "ous",
-        "iveness": "ive",
-        "biliti": "ble",
-        "enci": "ence",
-        "anci": "ance",
-        "logi": "log"
-    }
-
-    for suf, rep in suffix_map.items():
+    for suf, rep in STEP2_SUFFIX_MAP.items():
         if word.endswith(suf):
             if calculate_m(word[: -len(suf)]) > 0:
                 word = word[: -len(suf)] + rep
@@ -321,6 +358,117 @@ def simple_stemmer(word: str) -> str:
     
     return word
 
+# --- Bộ nhớ đệm cho Stemmer ---
+STEM_CACHE_SIZE = 100_000
+
+class StemCache:
+    """
+    Cache LRU word -> stem cho simple_stemmer (từ vựng tweet rất lặp lại nên tỉ lệ hit cao).
+    - maxsize: số từ tối đa giữ trong cache (None = không giới hạn)
+    - save()/load(): lưu bảng stem cạnh dữ liệu đã xử lý để lần chạy sau không phải stem lại
+    """
+
+    def __init__(self, maxsize=STEM_CACHE_SIZE, stemmer=simple_stemmer):
+        self.maxsize = maxsize
+        self._stemmer = stemmer
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._new = None   # dict các từ mới stem (chỉ khi track_new()), để process con gửi về process cha
+
+    def stem(self, word):
+        cache = self._cache
+        stem = cache.get(word)
+        if stem is not None:
+            cache.move_to_end(word)
+            self.hits += 1
+            return stem
+
+        self.misses += 1
+        stem = self._stemmer(word)
+        cache[word] = stem
+        if self._new is not None:
+            self._new[word] = stem
+        if self.maxsize is not None and len(cache) > self.maxsize:
+            cache.popitem(last=False)  # bỏ từ lâu nhất chưa dùng
+        return stem
+
+    __call__ = stem
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, word):
+        return word in self._cache
+
+    def warm(self, words):
+        """Stem trước toàn bộ từ vựng (không tính vào hits/misses)."""
+        for w in words:
+            if w not in self._cache:
+                self._cache[w] = self._stemmer(w)
+        self._evict()
+
+    def table(self):
+        """Bản sao bảng word -> stem hiện có (dict, thứ tự LRU)."""
+        return dict(self._cache)
+
+    def update(self, table):
+        """Thêm các cặp word -> stem đã tính ở nơi khác (không tính vào hits/misses)."""
+        for w, st in table.items():
+            self._cache[w] = st
+            self._cache.move_to_end(w)
+        self._evict()
+
+    def track_new(self):
+        """Bắt đầu ghi lại các từ mới stem, lấy ra bằng pop_new()."""
+        self._new = {}
+
+    def pop_new(self):
+        """Các cặp word -> stem mới từ lần gọi trước (rỗng nếu chưa track_new())."""
+        new = self._new or {}
+        if self._new is not None:
+            self._new = {}
+        return new
+
+    def _evict(self):
+        if self.maxsize is not None:
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def info(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._cache),
+            'maxsize': self.maxsize,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path):
+        """Lưu bảng word -> stem dạng columnar (src/storage.py)."""
+        words = list(self._cache)
+        save_columns(path, {
+            'word': np.array(words, dtype=str),
+            'stem': np.array([self._cache[w] for w in words], dtype=str),
+        })
+
+    def load(self, path):
+        """Nạp bảng word -> stem đã lưu (giữ thứ tự LRU như lúc lưu)."""
+        columns = load_columns(path, ['word', 'stem'])
+        self.update(dict(zip(columns['word'], columns['stem'])))
+        return self
+
+
+# Cache dùng chung cho clean_text_fast
+STEM_CACHE = StemCache()
+
+
 def clean_text(text):
     """Làm sạch + Xử lý Emoji + Stemming"""
     if not isinstance(text, str): return ""
@@ -380,6 +528,133 @@ def clean_text(text):
     return " ".join(stemmed_words)
 
 
+# --- Engine "fast": biên dịch sẵn mọi pattern một lần lúc import ---
+# Emoji: phần lớn tweet không có emoji nào -> kiểm tra nhanh bằng isascii()/isdisjoint() (chạy trong C)
+# rồi mới quét EMOJI_MAP theo đúng thứ tự như clean_text
+_EMOJI_ITEMS = [(emo, f" {meaning} ") for emo, meaning in EMOJI_MAP.items()]
+_EMOJI_ASCII_ITEMS = [(emo, rep) for emo, rep in _EMOJI_ITEMS if emo.isascii()]
+_EMOJI_FIRST_CHARS = frozenset(emo[0] for emo in EMOJI_MAP if not emo.isascii())
+
+# URL và HTML phải chạy riêng, đúng thứ tự như clean_text (xoá chúng có thể tạo ra mention mới)
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_HTML_PATTERN = re.compile(r"<.*?>")
+
+# Gộp: mention -> "\\n" -> "#" -> dấu câu. Cho cùng kết quả với 4 lần re.sub tuần tự
+# vì mỗi nhánh chỉ xoá, và "#"/"\\" đều đã thuộc lớp [^\w\s]
+_SYMBOL_PATTERN = re.compile(r"@\w+|\\n|[^\w\s]")
+_NUMBER_PATTERN = re.compile(r'\b\d+\b | \d+\b | \b\d+')
+# Mọi nhánh của _NUMBER_PATTERN đều cần chữ số đứng sát một dấu cách
+_NUMBER_HINT = re.compile(r'\d | \d').search
+
+# Xoá ký tự tiếng Việt có dấu bằng bảng translate (1 lượt, không tạo regex)
+_VIETNAMESE_CHARS = ("àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễ"
+                     "ìíịỉĩòóọỏõôồốộổỗơờớợởỡ"
+                     "ùúụủũưừứựửữỳýỵỷỹ"
+                     "đ"
+                     "ÀÁẠẢÃÂẦẤẬẨẪĂẰẮẶẲẴ"
+                     "ÈÉẸẺẼÊỀẾỆỂỄ"
+                     "ÌÍỊỈĨ"
+                     "ÒÓỌỎÕÔỒỐỘỔỖƠỜỚỢỞỠ"
+                     "ÙÚỤỦŨƯỪỨỰỬỮ"
+                     "ỲÝỴỶỸ"
+                     "Đ")
+_VIETNAMESE_DELETE = str.maketrans("", "", _VIETNAMESE_CHARS)
+
+
+def _replace_emoji(text):
+    if text.isascii() or _EMOJI_FIRST_CHARS.isdisjoint(text):
+        emoji_items = _EMOJI_ASCII_ITEMS
+    else:
+        emoji_items = _EMOJI_ITEMS
+    for emo, rep in emoji_items:
+        if emo in text: text = text.replace(emo, rep)
+    return text
+
+
+def _strip_text(text):
+    text = text.lower()
+    text = text.replace("n't", " not")
+
+    # Chỉ chạy regex khi chuỗi có thể khớp
+    if "http" in text or "www." in text:
+        text = _URL_PATTERN.sub("", text)
+    if "<" in text:
+        text = _HTML_PATTERN.sub("", text)
+
+    text = _SYMBOL_PATTERN.sub("", text)
+    if _NUMBER_HINT(text):
+        text = _NUMBER_PATTERN.sub(' ', text)
+
+    # Không cần gộp khoảng trắng: split() bên dưới đã bỏ qua khoảng trắng thừa
+    if not text.isascii():
+        text = text.translate(_VIETNAMESE_DELETE)
+    return text
+
+
+def _stem_text(text):
+    stem = STEM_CACHE.stem
+    words = text.split()
+    return " ".join([stem(w) for w in words if w not in MY_STOP_WORDS])
+
+
+def clean_text_fast(text):
+    """Giống hệt clean_text (cùng output) nhưng dùng các pattern đã biên dịch và gộp."""
+    if not isinstance(text, str): return ""
+    # 3 bước: emoji -> regex / ký tự -> bỏ stopword + stemming
+    return _stem_text(_strip_text(_replace_emoji(text)))
+
+
+CLEAN_TEXT_ENGINES = {
+    'reference': clean_text,
+    'fast': clean_text_fast,
+}
+
+
+# --- Kiểm tra parity: clean_text_fast phải cho output GIỐNG HỆT clean_text ---
+# Chạy riêng: python -m src.parity [--n 100000] [--seed 0]  (exit code 1 nếu có chuỗi lệch)
+# Corpus cố ý trộn các trường hợp dễ lệch giữa 2 engine: emoji (kể cả emoji ASCII như ":)"),
+# URL / HTML dính liền mention (xoá URL có thể tạo mention mới), "\\n" dạng chữ, "n't", số sát chữ,
+# dấu câu, chữ hoa, tiếng Việt có dấu và từ cần stemming.
+_PARITY_PIECES = [
+    'vaccine', 'Pfizer', 'running', 'happiness', 'studies', 'agreed', 'the', 'not', "don't", "CAN'T",
+    'https://t.co/abc', 'http://x.io/a@b', 'www.pfizer.com', 'https://t.co/x@user', '<b>', '</a>', '<a href="x">',
+    '<', '>', '@user_1', '@', '#COVID19', '#', '\\n', '\\', '12', '3.5', 'a1', '1a', '2021', '100%',
+    '!!!', '...', '?', ',', '_', '-', 'được', 'tiêm', 'Việt', 'ĐỦ', 'ổn', 'naïve', 'café',
+]
+_PARITY_SEPARATORS = ['', ' ', ' ', ' ', '  ', '\t', '\n']
+
+
+def generate_parity_corpus(n=20_000, seed=0):
+    """Sinh n chuỗi ngẫu nhiên (tái lập theo seed) để so sánh clean_text và clean_text_fast."""
+    rng = np.random.default_rng(seed)
+    pieces = np.array(_PARITY_PIECES + sorted(EMOJI_MAP), dtype=object)
+    separators = np.array(_PARITY_SEPARATORS, dtype=object)
+    lengths = rng.integers(0, 25, size=n)
+    corpus = []
+    for length in lengths:
+        words = rng.choice(pieces, length)
+        seps = rng.choice(separators, length)
+        corpus.append(''.join(w + sep for w, sep in zip(words, seps)))
+    # Giá trị không phải chuỗi (ô trống của CSV) -> cả 2 engine đều trả về ""
+    corpus.extend([None, float('nan'), 0, ''])
+    return corpus
+
+
+def check_clean_text_parity(texts=None, n=20_000, seed=0):
+    """
+    So sánh clean_text_fast với clean_text trên `texts` (mặc định generate_parity_corpus(n, seed)).
+    Trả về list (text, output clean_text, output clean_text_fast) của các trường hợp lệch.
+    """
+    if texts is None:
+        texts = generate_parity_corpus(n, seed)
+    mismatches = []
+    for t in texts:
+        expected, actual = clean_text(t), clean_text_fast(t)
+        if expected != actual:
+            mismatches.append((t, expected, actual))
+    return mismatches
+
+
 
 def generate_sentiment_label(text):
     """Gán nhãn (Silver Labels)"""
@@ -415,3 +690,160 @@ def improved_location_mapper(normalized_location, mapping_dict):
     
     # Nếu không khớp, giữ nguyên chuỗi đã được làm sạch
     return loc_lower
+
+
+
+# ================================================================================================
+# BATCH PROCESSING (Process Pool)
+# ================================================================================================
+# Dưới ngưỡng này chạy tuần tự vì chi phí khởi động process pool lớn hơn lợi ích
+PARALLEL_MIN_ITEMS = 2000
+DEFAULT_CHUNKSIZE = 500
+
+
+def _to_text(t):
+    # Giống vòng lặp trong notebook: decode bytes, còn lại ép về str
+    if isinstance(t, bytes):
+        return t.decode('utf-8')
+    return str(t)
+
+
+def _clean_chunk_staged(chunk):
+    """clean_text_fast chạy theo từng bước trên cả chunk để đo riêng thời gian mỗi bước."""
+    texts = [_to_text(t) for t in chunk]
+    n = len(texts)
+    instrumentation.count('tweets', n)
+    instrumentation.count('bytes', sum(len(t.encode('utf-8')) for t in texts))
+
+    with instrumentation.stage('emoji', n):
+        texts = [_replace_emoji(t) for t in texts]
+    with instrumentation.stage('regex_clean', n):
+        texts = [_strip_text(t) for t in texts]
+
+    hits, misses = STEM_CACHE.hits, STEM_CACHE.misses
+    with instrumentation.stage('stemming', n):
+        texts = [_stem_text(t) for t in texts]
+    instrumentation.count('tokens', sum(len(t.split()) for t in texts))
+    instrumentation.count('stem_cache_hits', STEM_CACHE.hits - hits)
+    instrumentation.count('stem_cache_misses', STEM_CACHE.misses - misses)
+    return texts
+
+
+def _clean_chunk(chunk, engine='fast'):
+    if instrumentation.enabled():
+        if engine == 'fast':
+            return _clean_chunk_staged(chunk)
+        with instrumentation.stage('clean_text', len(chunk)):
+            return [CLEAN_TEXT_ENGINES[engine](_to_text(t)) for t in chunk]
+    clean = CLEAN_TEXT_ENGINES[engine]
+    return [clean(_to_text(t)) for t in chunk]
+
+
+def _clean_label_chunk(chunk, engine='fast'):
+    if instrumentation.enabled():
+        cleaned = _clean_chunk(chunk, engine)
+        with instrumentation.stage('label', len(cleaned)):
+            return [(c, generate_sentiment_label(c)) for c in cleaned]
+    clean = CLEAN_TEXT_ENGINES[engine]
+    result = []
+    for t in chunk:
+        cleaned = clean(_to_text(t))
+        result.append((cleaned, generate_sentiment_label(cleaned)))
+    return result
+
+
+def _iter_chunks(items, chunksize):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _init_worker(stems, instrumented):
+    # Process con bắt đầu với bảng stem của process cha thay vì cache rỗng
+    STEM_CACHE.update(stems)
+    STEM_CACHE.track_new()
+    instrumentation.init_worker(instrumented)
+
+
+def _run_worker_chunk(func, chunk):
+    """
+    Chạy trong process con: kết quả của chunk + các stem mới + số liệu instrumentation của chunk,
+    để process cha gộp vào STEM_CACHE và registry của mình.
+    """
+    results = func(chunk)
+    metrics = instrumentation.snapshot(clear=True) if instrumentation.enabled() else None
+    return results, STEM_CACHE.pop_new(), metrics
+
+
+def _map_chunks(func, items, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Áp dụng `func` lên từng chunk của `items`, trả kết quả theo ĐÚNG thứ tự đầu vào (generator).
+    Chỉ giữ tối đa 2 * workers chunk đang xử lý để bộ nhớ không phụ thuộc vào số lượng tweet.
+    Process con nhận bảng STEM_CACHE hiện có; các từ mới stem và số liệu instrumentation (stage,
+    counter) của từng chunk được gộp lại ở process cha.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if hasattr(items, '__len__') and len(items) < PARALLEL_MIN_ITEMS:
+        workers = 1
+
+    if workers <= 1:
+        for chunk in _iter_chunks(items, chunksize):
+            yield from func(chunk)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    def collect(future):
+        results, stems, metrics = future.result()
+        STEM_CACHE.update(stems)
+        if metrics is not None:
+            instrumentation.merge(metrics)
+        return results
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(STEM_CACHE.table(), instrumentation.enabled()))
+    pending = deque()
+    try:
+        for chunk in _iter_chunks(items, chunksize):
+            pending.append(executor.submit(_run_worker_chunk, func, chunk))
+            if len(pending) >= 2 * workers:
+                yield from collect(pending.popleft())
+        while pending:
+            yield from collect(pending.popleft())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def clean_texts(texts, workers=None, chunksize=DEFAULT_CHUNKSIZE, stream=False, engine='fast'):
+    """
+    Phiên bản batch của clean_text: chia tweet thành các chunk và xử lý song song.
+    - workers: số process (None = số CPU, 1 = chạy tuần tự)
+    - stream=True: trả về generator để xử lý dần, ngược lại trả về list
+    - engine: 'fast' (clean_text_fast) hoặc 'reference' (clean_text), cùng kết quả
+    """
+    results = _map_chunks(partial(_clean_chunk, engine=engine), texts, workers, chunksize)
+    return results if stream else list(results)
+
+
+def clean_and_label_texts(texts, workers=None, chunksize=DEFAULT_CHUNKSIZE, stream=False, engine='fast'):
+    """
+    Làm sạch + gán nhãn cảm xúc trong cùng một lượt song song.
+    - stream=True: generator các cặp (cleaned_text, label)
+    - stream=False: (list cleaned_texts, np.array labels)
+    """
+    results = _map_chunks(partial(_clean_label_chunk, engine=engine), texts, workers, chunksize)
+    if stream:
+        return results
+    cleaned, labels = [], []
+    for c, label in results:
+        cleaned.append(c)
+        labels.append(label)
+    return cleaned, np.array(labels, dtype=int)
+
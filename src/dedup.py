@@ -0,0 +1,193 @@
+from collections import namedtuple
+from zlib import crc32
+
+import numpy as np
+
+
+# ================================================================================================
+# SHINGLES
+# ================================================================================================
+# Tweet copy / retweet / bài theo mẫu thường chỉ khác URL hoặc mention -> sau clean_text gần như
+# trùng nhau. Mỗi tweet được biểu diễn bằng tập shingle (n-gram từ), hai tweet gần trùng khi
+# Jaccard của hai tập shingle >= threshold.
+DEFAULT_NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_SHINGLE_SIZE = 2
+
+_PRIME = (1 << 31) - 1
+_EMPTY_HASH = np.uint32(_PRIME)      # chữ ký của tweet rỗng (không có shingle nào)
+_MAX_BATCH_SHINGLES = 1 << 16        # số shingle mỗi lần tính -> bộ nhớ ~ num_perm * 2^16 * 8 byte
+
+DedupResult = namedtuple('DedupResult', ['cluster', 'representatives', 'weights'])
+DedupResult.__doc__ = """
+Kết quả gom cụm gần trùng lặp:
+- cluster: (n,) mã cụm của từng tweet, đánh số theo thứ tự xuất hiện đầu tiên
+- representatives: (n_clusters,) chỉ số tweet đại diện (tweet xuất hiện đầu tiên) của từng cụm
+- weights: (n_clusters,) số tweet trong cụm -> dùng làm trọng số khi tính thống kê trên toàn bộ dữ liệu
+"""
+
+
+def shingles(text, size=DEFAULT_SHINGLE_SIZE):
+    """Tập n-gram từ (size từ liên tiếp) của một tweet; tweet ngắn hơn size từ -> một shingle là cả tweet."""
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    words = text.split()
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _shingle_hashes(texts, size):
+    """CSR của hash shingle: hash của tweet i = values[indptr[i]:indptr[i+1]] (uint64, đã mod _PRIME)."""
+    hashed = [[crc32(s.encode('utf-8')) for s in shingles(t, size)] for t in texts]
+    lengths = np.fromiter((len(h) for h in hashed), dtype=np.int64, count=len(hashed))
+    indptr = np.zeros(len(hashed) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    values = np.fromiter((x for h in hashed for x in h), dtype=np.uint64, count=int(indptr[-1]))
+    return indptr, values % _PRIME
+
+
+def choose_bands(threshold, num_perm):
+    """
+    Chọn (bands, rows) cho LSH: hai tweet thành ứng viên khi trùng toàn bộ `rows` giá trị ở ít nhất
+    một band, ngưỡng xấp xỉ (1 / bands) ** (1 / rows). Lấy rows lớn nhất có ngưỡng <= threshold
+    để ít bỏ sót; ứng viên sai được loại ở bước kiểm tra chữ ký.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+# ================================================================================================
+# MINHASH + LSH
+# ================================================================================================
+class MinHashLSH:
+    """
+    Gom các tweet gần trùng lặp bằng MinHash + LSH theo band, toàn bộ bằng NumPy:
+    - chữ ký: với mỗi hoán vị h(x) = (a * x + b) mod p, lấy min trên các shingle của tweet
+      (một phép tính ma trận + np.minimum.reduceat cho cả batch)
+    - LSH: băm từng band của chữ ký, tweet cùng bucket là ứng viên
+    - ứng viên được giữ nếu tỷ lệ trùng chữ ký (ước lượng Jaccard) >= threshold,
+      rồi nối thành cụm (connected components)
+
+        dedup = MinHashLSH(threshold=0.8)
+        result = dedup.fit(cleaned_texts)
+        texts_rep = cleaned_texts[result.representatives]
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE,
+                 bands=None, seed=0):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold phải nằm trong (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = choose_bands(threshold, num_perm) if bands is None else (bands, num_perm // bands)
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts):
+        """Ma trận chữ ký (n, num_perm) uint32."""
+        indptr, values = _shingle_hashes(texts, self.shingle_size)
+        n = len(indptr) - 1
+        sig = np.full((n, self.num_perm), _EMPTY_HASH, dtype=np.uint32)
+
+        # Chia theo số shingle để ma trận (num_perm, số shingle) không quá lớn
+        start = 0
+        while start < n:
+            stop = int(np.searchsorted(indptr, indptr[start] + _MAX_BATCH_SHINGLES, side='right')) - 1
+            stop = min(max(stop, start + 1), n)
+            lo, hi = indptr[start], indptr[stop]
+            if hi > lo:
+                x = values[lo:hi]
+                # a, x < 2^31 nên a * x + b < 2^63, không tràn uint64
+                hv = (self._a[:, None] * x[None, :] + self._b[:, None]) % _PRIME
+                starts = indptr[start:stop] - lo
+                non_empty = indptr[start + 1:stop + 1] > indptr[start:stop]
+                # Tweet rỗng có start trùng với tweet sau -> bỏ khỏi reduceat không làm lệch đoạn
+                sig[start:stop][non_empty] = np.minimum.reduceat(hv, starts[non_empty], axis=1).T
+            start = stop
+        return sig
+
+    def _candidate_edges(self, sig):
+        """Cặp (tweet, tweet đầu tiên cùng bucket) trên mọi band, đã kiểm tra ước lượng Jaccard."""
+        n = len(sig)
+        rng = np.random.default_rng(self.seed + 1)
+        mix = rng.integers(1, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        docs = np.arange(n)
+        sources, targets = [], []
+        for band in range(self.bands):
+            block = sig[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+            # Băm cả band thành một số 64 bit (tràn số = mod 2^64, chủ ý)
+            with np.errstate(over='ignore'):
+                keys = (block * mix).sum(axis=1)
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            leader = first[inverse.ravel()]
+            cand = docs[leader != docs]
+            if len(cand):
+                sources.append(cand)
+                targets.append(leader[cand])
+        if not sources:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        src = np.concatenate(sources)
+        dst = np.concatenate(targets)
+        pairs = np.unique(src * n + dst)
+        src, dst = pairs // n, pairs % n
+        agreement = (sig[src] == sig[dst]).mean(axis=1)
+        keep = agreement >= self.threshold
+        return src[keep], dst[keep]
+
+    def fit(self, texts):
+        """Gom cụm `texts` (thường là output của clean_text) -> DedupResult."""
+        texts = list(texts)
+        sig = self.signatures(texts)
+        src, dst = self._candidate_edges(sig)
+        labels = connected_components(len(texts), src, dst)
+        roots, cluster = np.unique(labels, return_inverse=True)
+        # Gốc của mỗi cụm là chỉ số nhỏ nhất -> roots tăng dần = thứ tự xuất hiện đầu tiên
+        return DedupResult(cluster.ravel().astype(np.int64), roots.astype(np.int64),
+                           np.bincount(cluster.ravel(), minlength=len(roots)))
+
+
+def connected_components(n, src, dst):
+    """
+    Nhãn thành phần liên thông của đồ thị n đỉnh với các cạnh (src, dst), nhãn = đỉnh nhỏ nhất.
+    Lan truyền nhãn nhỏ nhất qua cạnh + nhảy con trỏ, toàn bộ bằng NumPy.
+    """
+    labels = np.arange(n, dtype=np.int64)
+    if len(src) == 0:
+        return labels
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    while True:
+        low = np.minimum(labels[src], labels[dst])
+        updated = labels.copy()
+        np.minimum.at(updated, src, low)
+        np.minimum.at(updated, dst, low)
+        # Nhảy con trỏ: labels[i] <- labels[labels[i]] tới khi ổn định
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def deduplicate(texts, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE,
+                seed=0):
+    """Hàm tắt: MinHashLSH(...).fit(texts)."""
+    return MinHashLSH(threshold, num_perm, shingle_size, seed=seed).fit(texts)
+
+
+def expand(values, cluster):
+    """Rải giá trị tính trên các tweet đại diện (theo cụm) về toàn bộ tweet: values[cluster]."""
+    return np.asarray(values)[cluster]
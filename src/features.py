@@ -0,0 +1,290 @@
+import sys
+from collections import namedtuple
+from functools import partial
+from zlib import crc32
+
+import numpy as np
+
+from src.data_processing import _map_chunks
+
+
+# ================================================================================================
+# CSR ARRAYS
+# ================================================================================================
+# Một batch đã vector hoá ở dạng CSR thô (không phụ thuộc SciPy):
+#   dòng i = indices[indptr[i]:indptr[i+1]] (đã sắp xếp tăng dần), giá trị tương ứng trong data
+CSRArrays = namedtuple('CSRArrays', ['indptr', 'indices', 'data', 'shape'])
+
+DEFAULT_N_FEATURES = 1 << 18
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def to_csr(arrays):
+    """CSRArrays -> scipy.sparse.csr_matrix (không copy dữ liệu)."""
+    try:
+        import scipy.sparse as sp  # tuỳ chọn, chỉ nạp khi thật sự cần csr_matrix
+    except ImportError:
+        raise ImportError("Cần cài scipy để tạo csr_matrix; dùng transform_arrays() để lấy mảng CSR thô")
+    return sp.csr_matrix((arrays.data, arrays.indices, arrays.indptr), shape=arrays.shape, copy=False)
+
+
+def stack_csr(batches, n_features=0):
+    """Nối các CSRArrays theo chiều dọc thành một CSRArrays (n_features dùng khi không có batch nào)."""
+    batches = list(batches)
+    if not batches:
+        return CSRArrays(np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0),
+                         (0, n_features))
+    n_features = batches[0].shape[1]
+    indptr = [np.zeros(1, dtype=np.int64)]
+    offset = 0
+    for b in batches:
+        indptr.append(b.indptr[1:] + offset)
+        offset += b.indptr[-1]
+    n_rows = sum(b.shape[0] for b in batches)
+    return CSRArrays(np.concatenate(indptr),
+                     np.concatenate([b.indices for b in batches]),
+                     np.concatenate([b.data for b in batches]),
+                     (n_rows, n_features))
+
+
+def _normalize_rows(indptr, data, norm):
+    """Chuẩn hoá từng dòng CSR theo 'l1' / 'l2' (None = giữ nguyên). Dòng rỗng giữ nguyên."""
+    if norm is None:
+        return data
+    if norm not in ('l1', 'l2'):
+        raise ValueError(f"norm phải là 'l1', 'l2' hoặc None, nhận được {norm!r}")
+
+    lengths = np.diff(indptr)
+    non_empty = lengths > 0
+    values = data * data if norm == 'l2' else np.abs(data)
+    sums = np.zeros(len(lengths))
+    if len(values) > 0:
+        sums[non_empty] = np.add.reduceat(values, indptr[:-1][non_empty])
+    if norm == 'l2':
+        sums = np.sqrt(sums)
+    sums[sums == 0] = 1.0
+    return data / np.repeat(sums, lengths)
+
+
+# ================================================================================================
+# HASHING VECTORIZER
+# ================================================================================================
+def _token_hash(token):
+    return crc32(token.encode('utf-8'))
+
+
+def _vectorize_chunk(chunk, vectorizer):
+    # _map_chunks nối kết quả bằng `yield from` -> bọc batch trong list
+    return [vectorizer.transform_arrays(chunk)]
+
+
+class HashingVectorizer:
+    """
+    Vector hoá output của clean_text bằng hashing trick: cột = crc32(token) % n_features.
+    Không có vocab nên không cần fit, bộ nhớ chỉ phụ thuộc kích thước batch và
+    các worker có thể vector hoá từng phần dữ liệu độc lập (kết quả luôn giống nhau).
+
+    - ngram_range: (1, 1) chỉ unigram, (1, 2) thêm bigram (ghép sau khi bỏ stopword)
+    - alternate_sign: dấu +/- lấy từ bit cao nhất của hash để các va chạm triệt tiêu nhau về kỳ vọng
+    - stop_words: tập từ bị bỏ qua (None = giữ tất cả)
+    - norm: 'l2', 'l1' hoặc None
+    - binary: chỉ giữ dấu (+1/-1) thay vì số lần xuất hiện
+    """
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, ngram_range=(1, 1), alternate_sign=True,
+                 stop_words=None, norm='l2', binary=False, tokenizer=str.split):
+        if n_features < 1 or n_features > (1 << 31):
+            raise ValueError("n_features phải nằm trong [1, 2^31]")
+        if not 1 <= ngram_range[0] <= ngram_range[1]:
+            raise ValueError(f"ngram_range không hợp lệ: {ngram_range}")
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.alternate_sign = alternate_sign
+        self.stop_words = frozenset(stop_words) if stop_words is not None else None
+        self.norm = norm
+        self.binary = binary
+        self.tokenizer = tokenizer
+
+    def analyze(self, text):
+        """Danh sách feature (unigram / "w1 w2" ...) của một tweet."""
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        words = self.tokenizer(text)
+        if self.stop_words is not None:
+            words = [w for w in words if w not in self.stop_words]
+
+        lo, hi = self.ngram_range
+        if lo == hi == 1:
+            return words
+        features = list(words) if lo == 1 else []
+        for n in range(max(lo, 2), hi + 1):
+            features.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+        return features
+
+    def fit(self, texts=None, y=None):
+        # Không có trạng thái cần học, giữ để dùng chung giao diện với TfidfTransformer
+        return self
+
+    def transform_arrays(self, texts):
+        """
+        Vector hoá một batch thành CSRArrays.
+        Các feature của cả batch được hash vào một mảng phẳng, sau đó cộng dồn trùng lặp
+        (cùng dòng, cùng cột) bằng np.unique + np.bincount -> không có dict trung gian.
+        """
+        features = []
+        lengths = []
+        for t in texts:
+            f = self.analyze(t)
+            features.extend(f)
+            lengths.append(len(f))
+        n_docs = len(lengths)
+
+        hashes = np.fromiter(map(_token_hash, features), dtype=np.int64, count=len(features))
+        cols = hashes % self.n_features
+        if self.alternate_sign:
+            values = np.where(hashes & 0x80000000, -1.0, 1.0)
+        else:
+            values = np.ones(len(hashes))
+
+        # Khoá (dòng, cột) tăng dần -> indices trong mỗi dòng đã được sắp xếp
+        rows = np.repeat(np.arange(n_docs, dtype=np.int64), lengths)
+        keys, inverse = np.unique(rows * self.n_features + cols, return_inverse=True)
+        data = np.bincount(inverse.ravel(), weights=values, minlength=len(keys))
+
+        # Va chạm có dấu ngược nhau có thể triệt tiêu về 0 -> bỏ khỏi CSR
+        nonzero = data != 0
+        keys, data = keys[nonzero], data[nonzero]
+        if self.binary:
+            data = np.sign(data)
+
+        indptr = np.zeros(n_docs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // self.n_features, minlength=n_docs), out=indptr[1:])
+        indices = (keys % self.n_features).astype(np.int32)
+        data = _normalize_rows(indptr, data, self.norm)
+        return CSRArrays(indptr, indices, data, (n_docs, self.n_features))
+
+    def iter_transform_arrays(self, texts, batch_size=DEFAULT_BATCH_SIZE, workers=1):
+        """Generator các CSRArrays, mỗi batch batch_size tweet (workers > 1: chạy song song, giữ thứ tự)."""
+        return _map_chunks(partial(_vectorize_chunk, vectorizer=self), texts, workers, batch_size)
+
+    def iter_transform(self, texts, batch_size=DEFAULT_BATCH_SIZE, workers=1):
+        """Như iter_transform_arrays nhưng trả về scipy csr_matrix."""
+        for arrays in self.iter_transform_arrays(texts, batch_size, workers):
+            yield to_csr(arrays)
+
+    def transform(self, texts, batch_size=DEFAULT_BATCH_SIZE, workers=1):
+        """Vector hoá toàn bộ `texts` thành một scipy csr_matrix."""
+        return to_csr(stack_csr(self.iter_transform_arrays(texts, batch_size, workers), self.n_features))
+
+    def fit_transform(self, texts, y=None, **kwargs):
+        return self.transform(texts, **kwargs)
+
+
+# ================================================================================================
+# TF-IDF
+# ================================================================================================
+class TfidfTransformer:
+    """
+    Chuyển ma trận đếm (CSR) thành TF-IDF. Chỉ cần lưu document frequency (df) và số tweet,
+    nên có thể học dần bằng partial_fit() trên từng batch / gộp kết quả của nhiều worker.
+
+    idf = log((1 + n_docs) / (1 + df)) + 1   (smooth_idf=True, giống sklearn)
+    idf = log(n_docs / df) + 1               (smooth_idf=False)
+    """
+
+    def __init__(self, norm='l2', smooth_idf=True, sublinear_tf=False):
+        self.norm = norm
+        self.smooth_idf = smooth_idf
+        self.sublinear_tf = sublinear_tf
+
+    @staticmethod
+    def _as_arrays(X):
+        if isinstance(X, CSRArrays):
+            return X
+        sp = sys.modules.get('scipy.sparse')  # X thưa thì SciPy đã được nạp sẵn
+        if sp is not None and sp.issparse(X):
+            X = X.tocsr()
+            X.sum_duplicates()
+            return CSRArrays(X.indptr, X.indices, X.data, X.shape)
+        raise TypeError("TfidfTransformer nhận CSRArrays hoặc scipy sparse matrix")
+
+    def partial_fit(self, X):
+        """Cộng dồn df từ một batch (mỗi cột khác 0 trong một dòng tính 1 lần)."""
+        X = self._as_arrays(X)
+        n_features = X.shape[1]
+        if not hasattr(self, 'df_'):
+            self.df_ = np.zeros(n_features, dtype=np.int64)
+            self.n_docs_ = 0
+        elif len(self.df_) != n_features:
+            raise ValueError(f"Batch có {n_features} cột, trước đó là {len(self.df_)}")
+
+        self.df_ += np.bincount(X.indices[X.data != 0], minlength=n_features)
+        self.n_docs_ += X.shape[0]
+        self._idf = None
+        return self
+
+    def fit(self, X, y=None):
+        for attr in ('df_', 'n_docs_'):
+            if hasattr(self, attr):
+                delattr(self, attr)
+        return self.partial_fit(X)
+
+    def merge(self, other):
+        """Gộp df của một TfidfTransformer khác (ví dụ đã fit trên shard của worker khác)."""
+        if not hasattr(self, 'df_'):
+            self.df_ = other.df_.copy()
+            self.n_docs_ = other.n_docs_
+        else:
+            self.df_ += other.df_
+            self.n_docs_ += other.n_docs_
+        self._idf = None
+        return self
+
+    @property
+    def idf_(self):
+        if getattr(self, '_idf', None) is None:
+            df = self.df_.astype(np.float64)
+            n_docs = float(self.n_docs_)
+            if self.smooth_idf:
+                df += 1
+                n_docs += 1
+            with np.errstate(divide='ignore'):
+                # smooth_idf=False và df = 0 -> idf = inf, nhưng cột đó không xuất hiện nên không được dùng
+                self._idf = np.log(n_docs / df) + 1
+        return self._idf
+
+    def transform_arrays(self, X):
+        X = self._as_arrays(X)
+        data = X.data.astype(np.float64)
+        if self.sublinear_tf:
+            # 1 + log(tf), giữ dấu (hashing có dấu cho giá trị âm)
+            nonzero = data != 0
+            data[nonzero] = np.sign(data[nonzero]) * (1 + np.log(np.abs(data[nonzero])))
+        data = data * self.idf_[X.indices]
+        data = _normalize_rows(X.indptr, data, self.norm)
+        return CSRArrays(X.indptr, X.indices, data, X.shape)
+
+    def transform(self, X):
+        """Trả về cùng kiểu với đầu vào: CSRArrays -> CSRArrays, scipy sparse -> csr_matrix."""
+        result = self.transform_arrays(X)
+        return result if isinstance(X, CSRArrays) else to_csr(result)
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X).transform(X)
+
+
+class HashingTfidf:
+    """
+    HashingVectorizer (đếm thô, norm=None) + TfidfTransformer đã fit gộp thành một vectorizer:
+    transform(list_text) -> csr_matrix, dùng được làm `vectorizer` của src.serving.SentimentPredictor.
+    """
+
+    def __init__(self, hashing, tfidf):
+        self.hashing = hashing
+        self.tfidf = tfidf
+
+    def transform_arrays(self, texts):
+        return self.tfidf.transform_arrays(self.hashing.transform_arrays(texts))
+
+    def transform(self, texts):
+        return to_csr(self.transform_arrays(texts))
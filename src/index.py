@@ -0,0 +1,186 @@
+import json
+import os
+from bisect import bisect_left
+
+import numpy as np
+
+from src.aggregation import explode, truncate_day
+from src.storage import save_columns, load_columns
+
+
+# ================================================================================================
+# POSTINGS (CSR)
+# ================================================================================================
+# Cấu trúc thư mục của một index:
+#   index.json               -> {"n_rows", "fields": [...]}
+#   <field>/terms/           -> store cột: term (str), start, stop (int64)
+#   <field>/postings/        -> store cột: row (int32), row id đã sắp xếp tăng dần theo từng term
+# Postings của term i = row[start[i]:stop[i]], đọc lại bằng memmap nên không cần load toàn bộ.
+INDEX_FILE = 'index.json'
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def intersect_postings(*postings):
+    """
+    Giao các danh sách row id đã sắp xếp. Bắt đầu từ danh sách ngắn nhất và tìm nhị phân
+    trong danh sách dài hơn -> chi phí theo độ dài danh sách ngắn, không phải toàn bộ cột.
+    """
+    if not postings:
+        return _EMPTY
+    lists = sorted((np.asarray(p) for p in postings), key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        if len(result) == 0:
+            break
+        idx = np.searchsorted(other, result)
+        idx[idx == len(other)] = 0
+        result = result[other[idx] == result] if len(other) else _EMPTY
+    return np.asarray(result, dtype=np.int32)
+
+
+def union_postings(*postings):
+    """Hợp các danh sách row id (kết quả sắp xếp, không trùng)."""
+    postings = [np.asarray(p) for p in postings if len(p)]
+    if not postings:
+        return _EMPTY
+    if len(postings) == 1:
+        return np.asarray(postings[0], dtype=np.int32)
+    return np.unique(np.concatenate(postings)).astype(np.int32)
+
+
+class PostingsList:
+    """Một trường của index: term -> danh sách row id, lưu theo kiểu CSR."""
+
+    def __init__(self, terms, starts, stops, rows):
+        self.terms = terms      # mảng chuỗi hoặc StringColumn (đã sắp xếp)
+        self.starts = starts
+        self.stops = stops
+        self.rows = rows        # int32, postings của mọi term nối liền
+
+    @classmethod
+    def from_pairs(cls, rows, terms):
+        """Xây từ các cặp (row, term); cặp trùng nhau chỉ giữ một lần."""
+        rows = np.asarray(rows, dtype=np.int64)
+        uniques, codes = np.unique(np.asarray(terms, dtype=str), return_inverse=True)
+        codes = codes.ravel()
+        # Sắp theo (term, row) rồi bỏ cặp trùng
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        if len(rows):
+            keep = np.ones(len(rows), dtype=bool)
+            keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+            codes, rows = codes[keep], rows[keep]
+        stops = np.cumsum(np.bincount(codes, minlength=len(uniques))).astype(np.int64)
+        starts = stops - np.bincount(codes, minlength=len(uniques))
+        return cls(uniques, starts, stops, rows.astype(np.int32))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _index_of(self, term):
+        # terms đã sắp xếp (np.unique) -> tìm nhị phân, chỉ decode O(log n) term của StringColumn.
+        # Thứ tự code point của str trùng với thứ tự byte UTF-8 nên khớp với thứ tự đã lưu.
+        i = bisect_left(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            return i
+        return None
+
+    def get(self, term):
+        i = self._index_of(term)
+        if i is None:
+            return _EMPTY
+        return self.rows[self.starts[i]:self.stops[i]]
+
+    def doc_freq(self):
+        """(terms, số dòng chứa term)."""
+        return np.asarray(self.terms), np.asarray(self.stops) - np.asarray(self.starts)
+
+    def save(self, path):
+        save_columns(os.path.join(path, 'terms'),
+                     {'term': np.asarray(self.terms, dtype=str), 'start': self.starts, 'stop': self.stops})
+        save_columns(os.path.join(path, 'postings'), {'row': self.rows})
+
+    @classmethod
+    def load(cls, path):
+        terms = load_columns(os.path.join(path, 'terms'))
+        rows = load_columns(os.path.join(path, 'postings'))['row']
+        return cls(terms['term'], terms['start'], terms['stop'], rows)
+
+
+# ================================================================================================
+# INVERTED INDEX
+# ================================================================================================
+def _day_term(value):
+    return str(np.datetime64(value, 'D'))
+
+
+class InvertedIndex:
+    """
+    Index ngược trên các trường hashtag, token (text đã clean_text), day (ngày đăng), label.
+    Truy vấn kiểu "tweet tiêu cực ngày D" = giao 2 danh sách row id thay vì quét cả cột:
+
+        idx = InvertedIndex.build(len(data), hashtags=data['hashtags'], texts=cleaned,
+                                  dates=data['date'], labels=data['sentiment_label'])
+        rows = idx.query(day='2021-01-05', label=0)
+        neg_texts = text_col[rows]
+    """
+
+    def __init__(self, n_rows, fields):
+        self.n_rows = n_rows
+        self.fields = fields
+
+    @classmethod
+    def build(cls, n_rows, hashtags=None, texts=None, dates=None, labels=None):
+        fields = {}
+        if hashtags is not None:
+            # Cùng quy tắc với notebook: bỏ 'no_hashtag', tách theo khoảng trắng, chữ thường
+            fields['hashtag'] = PostingsList.from_pairs(*explode(hashtags))
+        if texts is not None:
+            fields['token'] = PostingsList.from_pairs(*explode(texts, lower=False, skip=('',)))
+        if dates is not None:
+            days = truncate_day(dates).astype(str)
+            fields['day'] = PostingsList.from_pairs(np.arange(len(days)), days)
+        if labels is not None:
+            # Ép về int trước khi thành term: nhãn float (0.0) phải khớp với _term -> '0'
+            labels = np.asarray(labels).astype(np.int64)
+            fields['label'] = PostingsList.from_pairs(np.arange(len(labels)), labels.astype(str))
+        return cls(n_rows, fields)
+
+    def _term(self, field, value):
+        if field == 'day':
+            return _day_term(value)
+        if field == 'label':
+            return str(int(value))
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value.lower() if field == 'hashtag' else value
+
+    def postings(self, field, value):
+        """Row id của các tweet có `field` == value (value là list/tuple/set -> hợp các giá trị)."""
+        if field not in self.fields:
+            raise KeyError(f"Index không có trường '{field}' (có: {sorted(self.fields)})")
+        if isinstance(value, (list, tuple, set, np.ndarray)):
+            return union_postings(*(self.fields[field].get(self._term(field, v)) for v in value))
+        return self.fields[field].get(self._term(field, value))
+
+    def query(self, **conditions):
+        """Giao điều kiện trên các trường, vd. query(day='2021-01-05', label=0, hashtag='pfizer')."""
+        if not conditions:
+            return np.arange(self.n_rows, dtype=np.int32)
+        return intersect_postings(*(self.postings(f, v) for f, v in conditions.items()))
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name, postings in self.fields.items():
+            postings.save(os.path.join(path, name))
+        with open(os.path.join(path, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'n_rows': int(self.n_rows), 'fields': list(self.fields)}, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Mở index đã lưu bằng memory mapping."""
+        with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        fields = {name: PostingsList.load(os.path.join(path, name)) for name in meta['fields']}
+        return cls(meta['n_rows'], fields)
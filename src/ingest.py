@@ -0,0 +1,260 @@
+import numpy as np
+
+
+# ================================================================================================
+# SCHEMA
+# ================================================================================================
+# Kiểu dữ liệu của từng cột trong file vaccination_tweets.csv
+# 'int' -> int64, 'datetime' -> datetime64[s], 'bool' -> bool, 'str' -> chuỗi unicode
+TWEET_SCHEMA = {
+    'id': 'int',
+    'user_name': 'str',
+    'user_location': 'str',
+    'user_description': 'str',
+    'user_created': 'datetime',
+    'user_followers': 'int',
+    'user_friends': 'int',
+    'user_favourites': 'int',
+    'user_verified': 'bool',
+    'date': 'datetime',
+    'text': 'str',
+    'hashtags': 'str',
+    'source': 'str',
+    'retweets': 'int',
+    'favorites': 'int',
+    'is_retweet': 'bool',
+}
+
+# Kích thước mỗi lần đọc (byte) -> quyết định bộ nhớ tối đa của một batch
+DEFAULT_CHUNK_SIZE = 1 << 24  # 16 MB
+
+_QUOTE = ord('"')
+_COMMA = ord(',')
+_NEWLINE = ord('\n')
+_CR = ord('\r')
+
+
+# ================================================================================================
+# STATE MACHINE
+# ================================================================================================
+def _split_records(buf, seps, final=False):
+    """
+    Ranh giới field/record trong `buf` từ các dấu phân cách `seps` đã biết là nằm NGOÀI dấu
+    ngoặc kép (vị trí byte, tăng dần). `buf` luôn bắt đầu tại đầu một record.
+
+    Trả về (starts, ends, n_fields, consumed):
+    - starts, ends: vị trí byte của từng field thuộc các record hoàn chỉnh
+    - n_fields: số field của từng record
+    - consumed: số byte đã dùng, phần còn lại là record dở dang để ghép với chunk sau
+    """
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    is_newline = arr[seps] == _NEWLINE
+
+    if final and len(arr) > 0 and (len(seps) == 0 or seps[-1] != len(arr) - 1 or not is_newline[-1]):
+        # Dòng cuối không có "\n" -> thêm một dấu xuống dòng ảo
+        seps = np.append(seps, len(arr))
+        is_newline = np.append(is_newline, True)
+
+    newline_idx = np.flatnonzero(is_newline)
+    if len(newline_idx) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, 0
+
+    seps = seps[:newline_idx[-1] + 1]
+    is_newline = is_newline[:newline_idx[-1] + 1]
+    consumed = int(seps[-1]) + 1
+
+    starts = np.empty(len(seps), dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = seps[:-1] + 1
+    ends = seps.astype(np.int64)
+
+    # Bỏ "\r" ở cuối record (file xuống dòng kiểu Windows)
+    record_ends = ends[is_newline]
+    has_cr = np.zeros(len(ends), dtype=bool)
+    valid = record_ends > starts[is_newline]
+    has_cr[np.flatnonzero(is_newline)[valid]] = arr[record_ends[valid] - 1] == _CR
+    ends[has_cr] -= 1
+
+    n_fields = np.diff(np.concatenate(([-1], newline_idx)))
+    return starts, ends, n_fields, consumed
+
+
+class _RecordSplitter:
+    """
+    Tách record qua nhiều chunk. Trạng thái "trong/ngoài quote" tại một vị trí = tính chẵn lẻ của
+    số dấu `"` đứng trước nó (`""` escape bật tắt 2 lần nên không ảnh hưởng).
+    Mỗi byte chỉ được quét MỘT lần: phần record dở dang được giữ dạng list chunk (chưa ghép) kèm
+    parity và vị trí các dấu phẩy ngoài quote, nên record trải qua m chunk tốn O(tổng kích thước)
+    thay vì quét lại từ đầu ở mỗi chunk.
+    """
+
+    def __init__(self):
+        self.parts = []    # các chunk của record dở dang
+        self.seps = []     # dấu phân cách ngoài quote trong parts (vị trí tính từ đầu parts[0])
+        self.size = 0
+        self.parity = 0    # số dấu " trong parts, chẵn (0) / lẻ (1)
+
+    def feed(self, chunk, final=False):
+        """
+        Thêm một chunk (final=True: hết file). Trả về (buf, starts, ends, n_fields) của các record
+        hoàn chỉnh, vị trí tính trong buf; chưa có record nào -> n_fields rỗng.
+        """
+        arr = np.frombuffer(chunk, dtype=np.uint8)
+        quotes = np.flatnonzero(arr == _QUOTE)
+        seps = np.flatnonzero((arr == _COMMA) | (arr == _NEWLINE))
+        # Chỉ giữ dấu phân cách có số dấu " đứng trước (tính cả các chunk trước) là số chẵn
+        seps = seps[((np.searchsorted(quotes, seps) + self.parity) & 1) == 0]
+        self.parity = (self.parity + len(quotes)) & 1
+        self.parts.append(chunk)
+        self.seps.append(seps + self.size)
+        self.size += len(chunk)
+
+        if final and self.parity:
+            # Kiểm tra TRƯỚC khi thêm dấu xuống dòng ảo, nếu không sẽ thành lỗi sai số cột
+            raise ValueError("File kết thúc khi vẫn còn dấu \" chưa đóng")
+        if not final and not (arr[seps] == _NEWLINE).any():
+            empty = np.empty(0, dtype=np.int64)
+            return b'', empty, empty, empty
+
+        buf = b''.join(self.parts)
+        seps = np.concatenate(self.seps)
+        starts, ends, n_fields, consumed = _split_records(buf, seps, final)
+        # Phần còn lại nằm trong chunk cuối (sau dấu xuống dòng cuối cùng) -> giữ lại, không quét lại
+        self.parts = [buf[consumed:]]
+        self.seps = [seps[seps >= consumed] - consumed]
+        self.size = len(buf) - consumed
+        return buf, starts, ends, n_fields
+
+
+def _unquote(field):
+    """Bỏ dấu ngoặc kép bao ngoài và chuyển `""` -> `"`."""
+    if field[:1] == b'"' and field[-1:] == b'"' and len(field) >= 2:
+        return field[1:-1].replace(b'""', b'"')
+    return field
+
+
+# ================================================================================================
+# CONVERTERS
+# ================================================================================================
+def _to_int(fields):
+    raw = np.array([f.strip() or b'0' for f in fields], dtype='S')
+    try:
+        return raw.astype(np.int64)
+    except ValueError:
+        # Một số dump ghi số dạng "12.0"
+        return raw.astype(np.float64).astype(np.int64)
+
+
+def _to_datetime(fields):
+    raw = np.array([f.strip() or b'NaT' for f in fields], dtype='S')
+    return raw.astype('datetime64[s]')
+
+
+def _to_bool(fields):
+    raw = np.array([f.strip() for f in fields], dtype='S')
+    return (raw == b'True') | (raw == b'true') | (raw == b'1')
+
+
+def _to_str(fields):
+    return np.array([f.decode('utf-8', errors='replace') for f in fields], dtype=str)
+
+
+_CONVERTERS = {
+    'int': _to_int,
+    'datetime': _to_datetime,
+    'bool': _to_bool,
+    'str': _to_str,
+}
+
+
+# ================================================================================================
+# PUBLIC API
+# ================================================================================================
+def iter_tweet_batches(path, chunk_size=DEFAULT_CHUNK_SIZE, schema=None, columns=None):
+    """
+    Đọc file CSV thô theo từng chunk `chunk_size` byte và trả về các batch dạng cột
+    (dict: tên cột -> np.ndarray đã đúng kiểu). Hỗ trợ tweet nhiều dòng và dấu `,` trong "...".
+    Bộ nhớ chỉ phụ thuộc vào `chunk_size`, không phụ thuộc kích thước file.
+
+    - schema: dict tên cột -> 'int' | 'datetime' | 'bool' | 'str' (mặc định TWEET_SCHEMA,
+      cột không có trong schema được đọc dạng chuỗi)
+    - columns: chỉ chuyển đổi các cột này (None = tất cả)
+    """
+    if schema is None:
+        schema = TWEET_SCHEMA
+
+    header = None
+    selected = None
+    splitter = _RecordSplitter()
+    line_no = 1
+
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            final = not chunk
+            buf, starts, ends, n_fields = splitter.feed(chunk, final=final)
+
+            if len(n_fields) > 0:
+                if header is None:
+                    # Record đầu tiên là header
+                    n_head = int(n_fields[0])
+                    header = [_unquote(buf[s:e]).decode('utf-8-sig').strip()
+                              for s, e in zip(starts[:n_head], ends[:n_head])]
+                    selected = [(j, name) for j, name in enumerate(header)
+                                if columns is None or name in columns]
+                    starts, ends, n_fields = starts[n_head:], ends[n_head:], n_fields[1:]
+                    line_no += 1
+
+                # Bỏ các dòng trống
+                blank = (n_fields == 1)
+                if blank.any():
+                    first = np.concatenate(([0], np.cumsum(n_fields)[:-1]))
+                    blank &= starts[first] == ends[first]
+                    keep = np.repeat(~blank, n_fields)
+                    starts, ends, n_fields = starts[keep], ends[keep], n_fields[~blank]
+
+                bad = np.flatnonzero(n_fields != len(header))
+                if len(bad) > 0:
+                    raise ValueError(
+                        f"Record thứ {line_no + int(bad[0])} có {int(n_fields[bad[0]])} cột, "
+                        f"header có {len(header)} cột")
+
+                if len(n_fields) > 0:
+                    starts = starts.reshape(-1, len(header))
+                    ends = ends.reshape(-1, len(header))
+                    batch = {}
+                    for j, name in selected:
+                        fields = [_unquote(buf[s:e]) for s, e in zip(starts[:, j], ends[:, j])]
+                        batch[name] = _CONVERTERS[schema.get(name, 'str')](fields)
+                    line_no += len(n_fields)
+                    yield batch
+
+            if final:
+                if header is not None and line_no == 2:
+                    # File chỉ có header -> một batch rỗng nhưng đủ cột, đúng kiểu
+                    yield {name: _CONVERTERS[schema.get(name, 'str')]([]) for j, name in selected}
+                break
+
+
+def batches_to_structured(batches):
+    """Ghép các batch dạng cột thành một NumPy Structured Array (giống `new_data` trong notebook)."""
+    parts = {}
+    for batch in batches:
+        for name, col in batch.items():
+            parts.setdefault(name, []).append(col)
+
+    if not parts:
+        return np.empty(0, dtype=[])
+
+    columns = {name: np.concatenate(cols) for name, cols in parts.items()}
+    n_rows = len(next(iter(columns.values())))
+    data = np.empty(n_rows, dtype=[(name, col.dtype) for name, col in columns.items()])
+    for name, col in columns.items():
+        data[name] = col
+    return data
+
+
+def load_tweets(path, chunk_size=DEFAULT_CHUNK_SIZE, schema=None, columns=None):
+    """Đọc toàn bộ file CSV thô thành Structured Array đã đúng kiểu (thay cho genfromtxt)."""
+    return batches_to_structured(iter_tweet_batches(path, chunk_size, schema, columns))
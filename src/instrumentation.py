@@ -0,0 +1,221 @@
+import functools
+import json
+import time
+
+
+# ================================================================================================
+# INSTRUMENTATION (opt-in)
+# ================================================================================================
+# Mặc định TẮT: stage() trả về một context rỗng dùng chung, count()/emit() return ngay,
+# nên code được gắn instrumentation gần như không tốn thêm chi phí khi không đo.
+#
+#   from src import instrumentation
+#   instrumentation.enable('metrics.jsonl')       # event ghi thẳng ra file JSON lines
+#   with instrumentation.stage('clean_text', items=len(texts)):
+#       ...
+#   instrumentation.count('tweets', len(texts))
+#   print(instrumentation.summary())               # tweets/s theo từng stage
+#   instrumentation.export_jsonl('summary.jsonl')
+#
+# Process con (workers > 1): init_worker() khi khởi động, snapshot(clear=True) gửi số liệu của mỗi
+# chunk về cùng kết quả, process cha cộng lại bằng merge(). Thời gian của stage khi đó là tổng thời
+# gian CPU của các process -> items_per_sec là tốc độ của một process.
+
+
+class _Registry:
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}    # tên -> [số lần gọi, tổng giây, tổng items]
+        self.counters = {}
+        self.events = []
+        self.max_events = 100_000
+        self.sink = None    # file JSON lines nhận event trực tiếp
+
+
+_REGISTRY = _Registry()
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, n):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _StageTimer:
+    __slots__ = ('name', 'items', 't0')
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        stats = _REGISTRY.stages.get(self.name)
+        if stats is None:
+            stats = _REGISTRY.stages[self.name] = [0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += self.items
+        return False
+
+    def add(self, n):
+        """Cộng thêm số phần tử đã xử lý khi chưa biết trước lúc vào stage."""
+        self.items += n
+
+
+def enable(path=None, max_events=100_000):
+    """
+    Bật instrumentation.
+    - path: nếu có, mỗi event được ghi ngay ra file này (JSON lines, chế độ append)
+    - max_events: số event tối đa giữ trong bộ nhớ khi không có path
+    """
+    disable()
+    _REGISTRY.enabled = True
+    _REGISTRY.max_events = max_events
+    if path is not None:
+        _REGISTRY.sink = open(path, 'a', encoding='utf-8')
+
+
+def disable():
+    _REGISTRY.enabled = False
+    if _REGISTRY.sink is not None:
+        _REGISTRY.sink.close()
+        _REGISTRY.sink = None
+
+
+def enabled():
+    return _REGISTRY.enabled
+
+
+def reset():
+    """Xoá mọi số liệu đã ghi (giữ nguyên trạng thái bật/tắt)."""
+    _REGISTRY.stages.clear()
+    _REGISTRY.counters.clear()
+    _REGISTRY.events.clear()
+
+
+def stage(name, items=0):
+    """Context manager đo thời gian một stage; `items` = số phần tử xử lý (để tính items/s)."""
+    if not _REGISTRY.enabled:
+        return _NULL_STAGE
+    return _StageTimer(name, items)
+
+
+def timed(name=None, items=None):
+    """
+    Decorator đo thời gian mỗi lần gọi hàm như một stage.
+    - items: hàm (*args, **kwargs) -> số phần tử, vd. lambda texts, *a, **k: len(texts)
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _REGISTRY.enabled:
+                return func(*args, **kwargs)
+            with _StageTimer(stage_name, items(*args, **kwargs) if items is not None else 0):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    if _REGISTRY.enabled:
+        _REGISTRY.counters[name] = _REGISTRY.counters.get(name, 0) + n
+
+
+def emit(event, **fields):
+    """Ghi một event (vd. metric của một vòng lặp huấn luyện)."""
+    if not _REGISTRY.enabled:
+        return
+    _record({'event': event, 'time': time.time(), **fields})
+
+
+def _record(record):
+    if _REGISTRY.sink is not None:
+        _REGISTRY.sink.write(json.dumps(record, default=_to_json) + '\n')
+    elif len(_REGISTRY.events) < _REGISTRY.max_events:
+        _REGISTRY.events.append(record)
+
+
+def init_worker(enabled):
+    """
+    Gọi trong process con: bật/tắt theo process cha, số liệu chỉ giữ trong bộ nhớ để gửi về bằng
+    snapshot(). File của process cha (kế thừa khi fork) không được ghi hay đóng ở đây.
+    """
+    _REGISTRY.sink = None
+    reset()
+    _REGISTRY.enabled = enabled
+
+
+def snapshot(clear=False):
+    """Số liệu thô (stages, counters, events) dạng picklable; clear=True: xoá sau khi lấy."""
+    data = {
+        'stages': {name: list(stats) for name, stats in _REGISTRY.stages.items()},
+        'counters': dict(_REGISTRY.counters),
+        'events': list(_REGISTRY.events),
+    }
+    if clear:
+        reset()
+    return data
+
+
+def merge(data):
+    """Cộng số liệu từ snapshot() của process khác vào registry hiện tại (kể cả khi đang tắt)."""
+    for name, (calls, seconds, items) in data['stages'].items():
+        stats = _REGISTRY.stages.get(name)
+        if stats is None:
+            stats = _REGISTRY.stages[name] = [0, 0.0, 0]
+        stats[0] += calls
+        stats[1] += seconds
+        stats[2] += items
+    for name, value in data['counters'].items():
+        _REGISTRY.counters[name] = _REGISTRY.counters.get(name, 0) + value
+    for record in data['events']:
+        _record(record)
+
+
+def _to_json(value):
+    # Số NumPy -> số Python
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def summary():
+    """{'stages': {tên: calls, seconds, items, items_per_sec}, 'counters': {...}}"""
+    stages = {}
+    for name, (calls, seconds, items) in _REGISTRY.stages.items():
+        stages[name] = {
+            'calls': calls,
+            'seconds': seconds,
+            'items': items,
+            'items_per_sec': items / seconds if seconds > 0 else None,
+        }
+    return {'stages': stages, 'counters': dict(_REGISTRY.counters)}
+
+
+def export_jsonl(path):
+    """Ghi tổng hợp stage, counter và các event đang giữ trong bộ nhớ ra file JSON lines."""
+    data = summary()
+    with open(path, 'w', encoding='utf-8') as f:
+        for name, stats in data['stages'].items():
+            f.write(json.dumps({'event': 'stage', 'stage': name, **stats}) + '\n')
+        for name, value in data['counters'].items():
+            f.write(json.dumps({'event': 'counter', 'counter': name, 'value': value}) + '\n')
+        for record in _REGISTRY.events:
+            f.write(json.dumps(record, default=_to_json) + '\n')
@@ -0,0 +1,313 @@
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.features import CSRArrays, to_csr
+from src.models import LogisticRegression, MultinomialNB, _issparse
+from src.pipeline import classification_metrics
+from src.storage import load_columns, save_columns
+
+
+# ================================================================================================
+# GRID + K-FOLD
+# ================================================================================================
+# Mỗi model: (class, tham số "đường regularization"). Các setting chỉ khác nhau ở tham số này
+# được fit lần lượt trên CÙNG một model trong một worker (warm start), theo thứ tự regularization
+# giảm dần: lambda_param lớn -> nhỏ (LogisticRegression bắt đầu từ weights của lambda trước),
+# alpha lớn -> nhỏ (MultinomialNB chỉ đếm một lần, đổi alpha rồi tính lại log-prob).
+ESTIMATORS = {
+    'logistic_regression': (LogisticRegression, 'lambda_param'),
+    'naive_bayes': (MultinomialNB, 'alpha'),
+}
+
+# 4 x 4 + 4 = 20 setting quanh cấu hình tay của notebook 03 (learning_rate=0.1, lambda_param=0.01)
+DEFAULT_GRID = {
+    'logistic_regression': {'learning_rate': [0.05, 0.1, 0.5, 1.0], 'lambda_param': [1.0, 0.1, 0.01, 0.001],
+                            'n_iters': [2000]},
+    'naive_bayes': {'alpha': [2.0, 1.0, 0.5, 0.1]},
+}
+
+SCORINGS = ('accuracy', 'macro_f1')
+
+
+def param_grid(grid):
+    """{'a': [1, 2], 'b': [3]} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}] (thứ tự như itertools.product)."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def stratified_kfold(y, n_splits=5, seed=42):
+    """Số thứ tự fold (0..n_splits-1) của từng dòng: mỗi nhãn được chia đều vào các fold sau khi xáo trộn."""
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    folds = np.empty(len(y), dtype=np.int64)
+    for cls in np.unique(y):
+        rows = rng.permutation(np.flatnonzero(y == cls))
+        # Lệch pha theo số dòng đã chia để fold đầu không luôn nhận phần dư của mọi nhãn
+        folds[rows] = (np.arange(len(rows)) + rng.integers(n_splits)) % n_splits
+    return folds
+
+
+# ================================================================================================
+# MA TRẬN DÙNG CHUNG (memmap)
+# ================================================================================================
+# X được ghi MỘT lần ra thư mục (src.storage, cùng bố cục 'indptr' / 'nnz' như stage 'vectorize'
+# của src.pipeline), mỗi worker mở lại bằng memory mapping -> các process dùng chung page cache
+# của hệ điều hành, không ai phải pickle / copy cả ma trận.
+MATRIX_META_FILE = 'matrix.json'
+
+
+def share_matrix(X, path):
+    """Ghi X (ndarray, scipy CSR hoặc CSRArrays) vào `path` để load_shared_matrix mở lại dạng memmap."""
+    if _issparse(X) or isinstance(X, CSRArrays):
+        X = X.tocsr() if _issparse(X) else X
+        save_columns(os.path.join(path, 'indptr'), {'indptr': np.asarray(X.indptr, dtype=np.int64)})
+        save_columns(os.path.join(path, 'nnz'), {'indices': np.asarray(X.indices), 'data': np.asarray(X.data)})
+        meta = {'format': 'csr', 'shape': list(X.shape)}
+    else:
+        X = np.asarray(X)
+        save_columns(os.path.join(path, 'dense'), {'data': X.ravel()})
+        meta = {'format': 'dense', 'shape': list(X.shape)}
+    with open(os.path.join(path, MATRIX_META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def load_shared_matrix(path):
+    """Mở ma trận đã ghi bằng share_matrix (không copy): scipy CSR hoặc ndarray 2 chiều (memmap)."""
+    with open(os.path.join(path, MATRIX_META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    shape = tuple(meta['shape'])
+    if meta['format'] == 'dense':
+        return load_columns(os.path.join(path, 'dense'))['data'].reshape(shape)
+    indptr = load_columns(os.path.join(path, 'indptr'))['indptr']
+    nnz = load_columns(os.path.join(path, 'nnz'))
+    return to_csr(CSRArrays(indptr, nnz['indices'], nnz['data'], shape))
+
+
+# ================================================================================================
+# WORKER
+# ================================================================================================
+# Trạng thái của mỗi process con, nạp một lần trong initializer
+_WORKER = {}
+
+
+def _init_worker(path, y, folds):
+    _WORKER['X'] = load_shared_matrix(path)
+    _WORKER['y'] = y
+    _WORKER['folds'] = folds
+
+
+def _fit_path(task):
+    """
+    Fit một model trên một fold cho lần lượt các giá trị của tham số đường regularization.
+    task = (tên model, tham số cố định, tên tham số đường, list giá trị, fold, warm_start)
+    """
+    name, fixed, path_param, path_values, fold, warm_start = task
+    X, y, folds = _WORKER['X'], _WORKER['y'], _WORKER['folds']
+    train, test = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+    X_train, X_test = X[train], X[test]
+    n_classes = int(y.max()) + 1
+
+    cls, _ = ESTIMATORS[name]
+    model = None
+    records = []
+    for value in path_values:
+        params = {**fixed, path_param: value}
+        t0 = time.perf_counter()
+        if name == 'naive_bayes' and warm_start and model is not None:
+            # Số đếm không phụ thuộc alpha -> chỉ tính lại log-prob
+            model.alpha = value
+            model._update_log_prob()
+        elif name == 'logistic_regression' and warm_start and model is not None:
+            model.lambda_param = value
+            model.fit(X_train, y[train])
+        else:
+            model = cls(**params, **({'warm_start': warm_start} if cls is LogisticRegression else {}))
+            model.fit(X_train, y[train])
+        fit_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        m = classification_metrics(y[test], model.predict(X_test), n_classes)
+        records.append({
+            'model': name, 'params': params, 'fold': int(fold),
+            'accuracy': m['accuracy'], 'macro_f1': m['macro_f1'],
+            'fit_seconds': fit_seconds, 'score_seconds': time.perf_counter() - t0,
+            'warm_started': bool(warm_start and len(records) > 0),
+            'pid': os.getpid(),
+        })
+    return records
+
+
+def _tasks(grid, n_splits, warm_start):
+    """Chia grid thành các task (model, tham số cố định, đường regularization, fold)."""
+    tasks = []
+    for name, model_grid in grid.items():
+        if name not in ESTIMATORS:
+            raise ValueError(f"Model không hợp lệ: {name} (chọn trong {sorted(ESTIMATORS)})")
+        _, path_param = ESTIMATORS[name]
+        fixed_grid = {k: v for k, v in model_grid.items() if k != path_param}
+        # Regularization mạnh -> yếu: nghiệm của bước trước là điểm xuất phát tốt cho bước sau
+        path_values = sorted(model_grid.get(path_param, [None]), reverse=True)
+        if path_values == [None]:
+            raise ValueError(f"Grid của {name} cần có '{path_param}'")
+        for fixed in param_grid(fixed_grid):
+            paths = [path_values] if warm_start else [[v] for v in path_values]
+            for values in paths:
+                for fold in range(n_splits):
+                    tasks.append((name, fixed, path_param, values, fold, warm_start))
+    # Task dài (nhiều giá trị trên đường) gửi trước để các worker kết thúc gần cùng lúc
+    tasks.sort(key=lambda t: (t[0] != 'logistic_regression', -len(t[3])))
+    return tasks
+
+
+# ================================================================================================
+# SEARCH
+# ================================================================================================
+def _summarize(records, scoring):
+    """Gộp kết quả theo setting: trung bình / độ lệch chuẩn của score và thời gian fit qua các fold."""
+    groups = {}
+    for r in records:
+        key = (r['model'], json.dumps(r['params'], sort_keys=True))
+        groups.setdefault(key, []).append(r)
+
+    results = []
+    for (name, _), rows in groups.items():
+        rows.sort(key=lambda r: r['fold'])
+        entry = {'model': name, 'params': rows[0]['params'], 'n_folds': len(rows)}
+        for metric in SCORINGS:
+            scores = np.array([r[metric] for r in rows])
+            entry[f'mean_{metric}'] = float(scores.mean())
+            entry[f'std_{metric}'] = float(scores.std())
+            entry[f'fold_{metric}'] = scores.tolist()
+        entry['mean_fit_seconds'] = float(np.mean([r['fit_seconds'] for r in rows]))
+        results.append(entry)
+    results.sort(key=lambda e: -e[f'mean_{scoring}'])
+    return results
+
+
+def grid_search_cv(X, y, grid=None, n_splits=5, scoring='macro_f1', workers=None, warm_start=False,
+                   seed=42, shared_dir=None, log=print):
+    """
+    K-fold cross-validation cho mọi setting trong `grid`, chạy song song trên một process pool.
+    - X: ndarray / scipy CSR / CSRArrays, ghi MỘT lần ra memmap (shared_dir, mặc định thư mục tạm)
+    - grid: {tên model: {tham số: [giá trị]}} (mặc định DEFAULT_GRID, 20 setting)
+    - warm_start: fit các giá trị lambda_param / alpha của cùng một (model, tham số khác, fold)
+      nối tiếp nhau từ nghiệm trước, ít task hơn nhưng mỗi task dài hơn. Với solver 'lbfgs' (hội tụ
+      tới cùng nghiệm) và MultinomialNB kết quả như fit từ đầu; với 'gd' (số vòng lặp cố định)
+      model được chạy thêm n_iters vòng từ nghiệm trước nên score không đúng bằng fit từ đầu.
+      False -> mỗi setting fit từ đầu trong một task riêng
+    - workers: số process (None = số CPU, 1 = chạy tuần tự trong process hiện tại)
+    Trả về dict:
+      'results': mỗi setting một dòng (mean/std/score từng fold), sắp theo `scoring` giảm dần
+      'best': dòng đầu của 'results'
+      'folds': kết quả thô từng (setting, fold) gồm fit_seconds, score_seconds, pid
+      'seconds', 'workers', 'n_tasks'
+    """
+    if scoring not in SCORINGS:
+        raise ValueError(f"scoring phải là một trong {SCORINGS}")
+    grid = DEFAULT_GRID if grid is None else grid
+    y = np.asarray(y, dtype=np.int64)
+    folds = stratified_kfold(y, n_splits, seed)
+    tasks = _tasks(grid, n_splits, warm_start)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    own_dir = shared_dir is None
+    path = tempfile.mkdtemp(prefix='cv_matrix_') if own_dir else shared_dir
+    t0 = time.perf_counter()
+    try:
+        share_matrix(X, path)
+        records = []
+        if workers <= 1:
+            _init_worker(path, y, folds)
+            for i, task in enumerate(tasks, 1):
+                records.extend(_fit_path(task))
+                log(f"[cv] {i}/{len(tasks)} task xong ({time.perf_counter() - t0:.1f}s)")
+            _WORKER.clear()
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(path, y, folds)) as executor:
+                futures = [executor.submit(_fit_path, task) for task in tasks]
+                for i, future in enumerate(as_completed(futures), 1):
+                    records.extend(future.result())
+                    log(f"[cv] {i}/{len(tasks)} task xong ({time.perf_counter() - t0:.1f}s)")
+    finally:
+        if own_dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+    results = _summarize(records, scoring)
+    return {
+        'results': results,
+        'best': results[0] if results else None,
+        'folds': records,
+        'seconds': time.perf_counter() - t0,
+        'workers': workers,
+        'n_tasks': len(tasks),
+    }
+
+
+def format_results(search, scoring='macro_f1', top=None):
+    """Bảng text: model, tham số, mean ± std của score và thời gian fit trung bình mỗi fold."""
+    lines = [f"{'Model':<22} {'Params':<48} {scoring:>16} {'fit/fold':>9}"]
+    for entry in search['results'][:top]:
+        params = ", ".join(f"{k}={v}" for k, v in entry['params'].items())
+        score = f"{entry[f'mean_{scoring}']:.4f} ± {entry[f'std_{scoring}']:.4f}"
+        lines.append(f"{entry['model']:<22} {params:<48} {score:>16} {entry['mean_fit_seconds']:>8.2f}s")
+    lines.append(f"{len(search['results'])} setting x {search['results'][0]['n_folds'] if search['results'] else 0} "
+                 f"fold, {search['n_tasks']} task trên {search['workers']} process: {search['seconds']:.1f}s")
+    return "\n".join(lines)
+
+
+# ================================================================================================
+# CLI: python -m src.model_selection [--folds 5] [--workers 8]  (dùng kết quả của src.pipeline)
+# ================================================================================================
+def main(argv=None):
+    import argparse
+
+    from src.config import DIR_PATH_PIPELINE, FILE_PATH_VACCINENATION_TWEETS
+    from src.pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="K-fold CV + dò siêu tham số trên ma trận TF-IDF của src.pipeline")
+    parser.add_argument('--raw', default=FILE_PATH_VACCINENATION_TWEETS, help="file CSV thô (như src.pipeline)")
+    parser.add_argument('--out', default=DIR_PATH_PIPELINE, help="thư mục kết quả của src.pipeline")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--scoring', default='macro_f1', choices=SCORINGS)
+    parser.add_argument('--workers', type=int, default=None, help="số process (mặc định = số CPU)")
+    parser.add_argument('--warm-start', action='store_true',
+                        help="fit nối tiếp theo lambda_param / alpha giảm dần (xem grid_search_cv)")
+    parser.add_argument('--grid', help="file JSON {model: {tham số: [giá trị]}} thay cho DEFAULT_GRID")
+    parser.add_argument('--output', help="ghi toàn bộ kết quả (kể cả từng fold) ra file JSON")
+    args = parser.parse_args(argv)
+
+    grid = None
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+
+    # Ma trận + nhãn lấy thẳng từ các stage đã có (chạy tới 'label' và 'vectorize' nếu chưa có)
+    pipeline = Pipeline(args.raw, args.out, workers=args.workers)
+    pipeline.run('label')
+    pipeline.run('vectorize')
+    X = pipeline.load_matrix()
+    y = np.asarray(pipeline.load('label')['sentiment_label'])[pipeline.representatives()]
+
+    search = grid_search_cv(X, y, grid, n_splits=args.folds, scoring=args.scoring, workers=args.workers,
+                            warm_start=args.warm_start)
+    print()
+    print(format_results(search, args.scoring))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(search, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,98 @@
+import sys
+import time
+
 import numpy as np
 
+import src.instrumentation as instrumentation
+
+
+def _issparse(X):
+    """
+    X có phải ma trận thưa SciPy không (cho phép truyền thẳng CSR của TF-IDF, không cần toarray()).
+    Không import SciPy: nếu X là ma trận thưa thì scipy.sparse chắc chắn đã được nạp.
+    """
+    sp = sys.modules.get('scipy.sparse')
+    return sp is not None and sp.issparse(X)
+
+
+def _check_X(X):
+    """Giữ nguyên ma trận thưa (chuyển về CSR), còn lại chuyển về np.ndarray."""
+    if _issparse(X):
+        return X.tocsr()
+    return np.asarray(X)
+
 
 
 # ==============================================================================
 # 1. LOGISTIC REGRESSION
 # ==============================================================================
 class LogisticRegression:
-    def __init__(self, learning_rate=0.01, n_iters=1000, lambda_param=0.1):
+    """
+    multi_class:
+    - 'ovr': One vs Rest, huấn luyện lần lượt từng lớp (cách gốc)
+    - 'ovr_batched': One vs Rest nhưng gom weights mọi lớp thành 1 ma trận (K, n_features),
+      mỗi vòng lặp chỉ cần 1 phép nhân ma trận thay vì K phép X @ w
+    - 'multinomial': Softmax regression, cũng cập nhật cả ma trận W cùng lúc
+
+    solver:
+    - 'gd': Gradient Descent trên toàn bộ X, n_iters vòng lặp (cách gốc)
+    - 'sgd': Mini-batch SGD, n_iters là số epoch; mỗi bước chỉ cần batch_size dòng của X
+      nên X có thể là np.memmap. Dùng partial_fit() để học tiếp từ dữ liệu mới.
+    - 'lbfgs': Quasi-Newton L-BFGS, dừng khi gradient < tol (n_iters là số vòng lặp tối đa),
+      thường hội tụ sau vài chục vòng.
+
+    warm_start=True: 'lbfgs' và 'gd' bắt đầu từ weights đang có trong self.models thay vì từ 0
+    (vd. fit lần lượt các lambda_param giảm dần trên cùng một model khi dò siêu tham số).
+
+    loss_every: với 'gd', chỉ tính loss mỗi loss_every vòng lặp (loss_history[i] là loss của vòng
+    i * loss_every); mặc định 1 = tính mọi vòng như cách gốc. Khi instrumentation được bật, mỗi vòng
+    lặp ghi một event 'train_iter' (thời gian vòng lặp, loss nếu vòng đó có tính).
+
+    loss_history có cùng dạng với mọi solver: OvR ('ovr', 'ovr_batched') -> {nhãn: [loss]},
+    'multinomial' -> {'multinomial': [loss]}.
+    """
+    MULTI_CLASS_MODES = ('ovr', 'ovr_batched', 'multinomial')
+    SOLVERS = ('gd', 'sgd', 'lbfgs')
+    LR_SCHEDULES = ('constant', 'invscaling')
+
+    def __init__(self, learning_rate=0.01, n_iters=1000, lambda_param=0.1, multi_class='ovr',
+                 solver='gd', batch_size=256, lr_schedule='constant', power_t=0.5,
+                 shuffle=True, random_state=None, tol=1e-4, warm_start=False, history_size=10,
+                 loss_every=1):
+        if multi_class not in self.MULTI_CLASS_MODES:
+            raise ValueError(f"multi_class phải là một trong {self.MULTI_CLASS_MODES}")
+        if solver not in self.SOLVERS:
+            raise ValueError(f"solver phải là một trong {self.SOLVERS}")
+        if lr_schedule not in self.LR_SCHEDULES:
+            raise ValueError(f"lr_schedule phải là một trong {self.LR_SCHEDULES}")
         self.lr = learning_rate
         self.n_iters = n_iters
         self.lambda_param = lambda_param  # L2 regularization
+        self.multi_class = multi_class
+        self.solver = solver
+        self.batch_size = batch_size
+        self.lr_schedule = lr_schedule
+        self.power_t = power_t
+        self.shuffle = shuffle
+        self.random_state = random_state
+        self.tol = tol
+        self.warm_start = warm_start
+        self.history_size = history_size  # số cặp (s, y) L-BFGS lưu lại
+        self.loss_every = max(1, int(loss_every))
         self.models = {}  # lưu weights và bias cho từng nhãn
-        self.loss_history = {}  # lưu loss từng nhãn
+        self.loss_history = {}  # lưu loss từng nhãn ('multinomial': một loss chung)
 
     def _sigmoid(self, x):
         return 1 / (1 + np.exp(-np.clip(x, -250, 250)))
 
+    def _softmax(self, Z):
+        Z = Z - Z.max(axis=1, keepdims=True)  # trừ max để exp không tràn số
+        exp_Z = np.exp(Z)
+        return exp_Z / exp_Z.sum(axis=1, keepdims=True)
+
+    def _one_hot(self, y):
+        return (np.asarray(y).reshape(-1, 1) == self.classes_.reshape(1, -1)).astype(float)
+
     def _compute_loss(self, y, y_pred, weights):
         epsilon = 1e-15
         y_pred = np.clip(y_pred, epsilon, 1 - epsilon)
@@ -23,52 +100,374 @@ class LogisticRegression:
         l2_penalty = (self.lambda_param / 2) * np.sum(weights ** 2)
         return log_loss + l2_penalty
 
-    def _fit_binary(self, X, y_binary, verbose=False):
+    def _fit_binary(self, X, y_binary, verbose=False, label=None, weights=None, bias=0):
+        X = _check_X(X)
         n_samples, n_features = X.shape
-        weights = np.zeros(n_features)
-        bias = 0
+        weights = np.zeros(n_features) if weights is None else np.array(weights, dtype=float)
         loss_hist = []
+        track = instrumentation.enabled()
 
         for iteration in range(self.n_iters):
-            linear_model = np.dot(X, weights) + bias
+            t0 = time.perf_counter() if track else 0.0
+            # Dùng toán tử @ để chạy được cả với ma trận thưa (sparse @ dense)
+            linear_model = X @ weights + bias
             y_predicted = self._sigmoid(linear_model)
-            loss = self._compute_loss(y_binary, y_predicted, weights)
-            loss_hist.append(loss)
+            loss = None
+            if iteration % self.loss_every == 0 or (verbose and iteration % 100 == 0):
+                loss = self._compute_loss(y_binary, y_predicted, weights)
+                if iteration % self.loss_every == 0:
+                    loss_hist.append(loss)
 
-            dw = (1 / n_samples) * np.dot(X.T, (y_predicted - y_binary)) + (self.lambda_param / n_samples) * weights
+            dw = (1 / n_samples) * (X.T @ (y_predicted - y_binary)) + (self.lambda_param / n_samples) * weights
             db = (1 / n_samples) * np.sum(y_predicted - y_binary)
 
             weights -= self.lr * dw
             bias -= self.lr * db
 
+            if track:
+                instrumentation.emit('train_iter', model='LogisticRegression', label=label,
+                                     iteration=iteration, seconds=time.perf_counter() - t0, loss=loss)
             if verbose and iteration % 100 == 0:
                 print(f"Iteration {iteration}, Loss: {loss:.4f}")
 
         return weights, bias, loss_hist
 
+    def _compute_loss_matrix(self, Y, P, W):
+        """Loss cho cả ma trận: OvR -> mảng (K,) loss từng lớp, multinomial -> 1 số (cross-entropy)."""
+        epsilon = 1e-15
+        P = np.clip(P, epsilon, 1 - epsilon)
+        if self.multi_class == 'multinomial':
+            return -np.mean(np.sum(Y * np.log(P), axis=1)) + (self.lambda_param / 2) * np.sum(W ** 2)
+        log_loss = -np.mean(Y * np.log(P) + (1 - Y) * np.log(1 - P), axis=0)
+        return log_loss + (self.lambda_param / 2) * np.sum(W ** 2, axis=1)
+
+    # W lưu theo dạng (K, n_features): với X dense, BLAS xử lý W @ X.T và R.T @ X (ma trận "rộng")
+    # nhanh hơn hẳn X @ W / X.T @ R khi K nhỏ
+    @staticmethod
+    def _linear(X, W):
+        """X @ W.T -> (n_samples, K)"""
+        if _issparse(X):
+            return X @ W.T
+        return (W @ X.T).T
+
+    @staticmethod
+    def _gradient(X, R):
+        """R.T @ X -> (K, n_features)"""
+        if _issparse(X):
+            return (X.T @ R).T
+        return R.T @ X
+
+    def _predict_matrix(self, X, W, b):
+        Z = self._linear(X, W) + b
+        return self._softmax(Z) if self.multi_class == 'multinomial' else self._sigmoid(Z)
+
+    def _fit_matrix(self, X, Y, verbose=False, W=None, b=None):
+        """Gradient Descent cho cả K lớp cùng lúc: W (K, n_features), b (K,)."""
+        n_samples, n_features = X.shape
+        W = np.zeros((Y.shape[1], n_features)) if W is None else W
+        b = np.zeros(Y.shape[1]) if b is None else b
+        loss_hist = []
+        track = instrumentation.enabled()
+
+        for iteration in range(self.n_iters):
+            t0 = time.perf_counter() if track else 0.0
+            P = self._predict_matrix(X, W, b)
+            loss = None
+            if iteration % self.loss_every == 0 or (verbose and iteration % 100 == 0):
+                loss = self._compute_loss_matrix(Y, P, W)
+                if iteration % self.loss_every == 0:
+                    loss_hist.append(loss)
+
+            # Cùng công thức gradient (P - Y) cho cả sigmoid-OvR lẫn softmax
+            dW = (1 / n_samples) * self._gradient(X, P - Y) + (self.lambda_param / n_samples) * W
+            db = (1 / n_samples) * np.sum(P - Y, axis=0)
+
+            W -= self.lr * dW
+            b -= self.lr * db
+
+            if track:
+                instrumentation.emit('train_iter', model='LogisticRegression', label=self.multi_class,
+                                     iteration=iteration, seconds=time.perf_counter() - t0,
+                                     loss=None if loss is None else float(np.mean(loss)))
+            if verbose and iteration % 100 == 0:
+                print(f"Iteration {iteration}, Loss: {np.mean(loss):.4f}")
+
+        return W, b, np.array(loss_hist)
+
+    def _set_params(self, W, b):
+        """Lưu tham số dạng ma trận (coef_ (K, n_features), intercept_) và dạng dict từng lớp (models)."""
+        self.coef_ = W
+        self.intercept_ = b
+        self.models = {cls: {'weights': W[idx], 'bias': b[idx]} for idx, cls in enumerate(self.classes_)}
+
+    # --- Mini-batch SGD ---
+    def _learning_rate(self):
+        if self.lr_schedule == 'invscaling':
+            return self.lr / (1 + self.t_) ** self.power_t
+        return self.lr
+
+    def _record_loss(self, loss):
+        if self.multi_class == 'multinomial':
+            self.loss_history.setdefault('multinomial', []).append(float(loss))
+        else:
+            for idx, cls in enumerate(self.classes_):
+                self.loss_history.setdefault(cls, []).append(float(loss[idx]))
+
+    def _sgd_step(self, X_batch, Y_batch, n_total):
+        """Một bước cập nhật trên 1 mini-batch. Trả về loss của batch."""
+        W, b = self.coef_, self.intercept_
+        n_batch = X_batch.shape[0]
+        P = self._predict_matrix(X_batch, W, b)
+        loss = self._compute_loss_matrix(Y_batch, P, W)
+
+        # L2 chia cho tổng số mẫu (không phải kích thước batch) để cùng mục tiêu với 'gd'
+        dW = (1 / n_batch) * self._gradient(X_batch, P - Y_batch) + (self.lambda_param / n_total) * W
+        db = (1 / n_batch) * np.sum(P - Y_batch, axis=0)
+
+        lr = self._learning_rate()
+        W -= lr * dW
+        b -= lr * db
+        self.t_ += 1
+        return loss
+
+    def _init_params(self, n_features):
+        self.t_ = 0
+        self.n_samples_seen_ = 0
+        self.loss_history = {}
+        self._set_params(np.zeros((len(self.classes_), n_features)), np.zeros(len(self.classes_)))
+
+    def _fit_sgd(self, X, y, verbose=False):
+        n_samples = X.shape[0]
+        Y = self._one_hot(y)
+        rng = np.random.default_rng(self.random_state)
+        self._init_params(X.shape[1])
+
+        for epoch in range(self.n_iters):
+            order = rng.permutation(n_samples) if self.shuffle else np.arange(n_samples)
+            epoch_loss = 0
+            for start in range(0, n_samples, self.batch_size):
+                idx = order[start:start + self.batch_size]
+                if not self.shuffle:
+                    idx = slice(start, start + self.batch_size)  # slice -> không copy khi X là memmap
+                loss = self._sgd_step(X[idx], Y[idx], n_samples)
+                n_batch = min(self.batch_size, n_samples - start)
+                epoch_loss = epoch_loss + loss * (n_batch / n_samples)
+            self._record_loss(epoch_loss)
+
+            if verbose and epoch % 10 == 0:
+                print(f"Epoch {epoch}, Loss: {np.mean(epoch_loss):.4f}")
+
+        self.n_samples_seen_ = n_samples
+        self._set_params(self.coef_, self.intercept_)
+        return self
+
+    def partial_fit(self, X, y, classes=None):
+        """
+        Học tiếp trên một batch dữ liệu mới (1 lượt qua batch, chia theo batch_size).
+        - classes: danh sách mọi nhãn có thể có, bắt buộc ở lần gọi đầu tiên
+          (vì một batch có thể không chứa đủ các lớp)
+        """
+        X = _check_X(X)
+        y = np.asarray(y)
+        if not hasattr(self, 't_'):
+            if classes is None:
+                raise ValueError("Lần gọi partial_fit đầu tiên cần truyền classes")
+            self.classes_ = np.unique(classes)
+            self._init_params(X.shape[1])
+        elif classes is not None and not np.array_equal(np.unique(classes), self.classes_):
+            raise ValueError("classes khác với lần gọi partial_fit trước")
+
+        Y = self._one_hot(y)
+        self.n_samples_seen_ += X.shape[0]
+        for start in range(0, X.shape[0], self.batch_size):
+            batch = slice(start, start + self.batch_size)
+            loss = self._sgd_step(X[batch], Y[batch], self.n_samples_seen_)
+            self._record_loss(loss)
+        self._set_params(self.coef_, self.intercept_)
+        return self
+
+    # --- L-BFGS ---
+    def _objective(self, theta, X, Y):
+        """
+        Hàm mục tiêu J = mean log-loss + (lambda / 2m) * ||W||^2 và gradient của nó
+        (đúng hàm mà bước cập nhật của 'gd' đang tối ưu). Với OvR: tổng loss của K bài toán nhị phân.
+        Loss tính trực tiếp từ logit (logaddexp) nên không cần clip.
+        Trả về (loss, gradient, loss theo lớp): loss theo lớp là mảng (K,) với OvR, bằng loss với multinomial.
+        """
+        n_samples, n_features = X.shape
+        K = Y.shape[1]
+        W = theta[:K * n_features].reshape(K, n_features)
+        b = theta[K * n_features:]
+
+        Z = self._linear(X, W) + b
+        if self.multi_class == 'multinomial':
+            Z_max = Z.max(axis=1, keepdims=True)
+            log_norm = Z_max + np.log(np.sum(np.exp(Z - Z_max), axis=1, keepdims=True))
+            data_loss = np.sum(log_norm - np.sum(Y * Z, axis=1, keepdims=True)) / n_samples
+            P = np.exp(Z - log_norm)
+            class_loss = data_loss + (self.lambda_param / (2 * n_samples)) * np.sum(W ** 2)
+        else:
+            data_loss = np.sum(np.logaddexp(0, Z) - Y * Z, axis=0) / n_samples
+            P = self._sigmoid(Z)
+            class_loss = data_loss + (self.lambda_param / (2 * n_samples)) * np.sum(W ** 2, axis=1)
+
+        loss = float(np.sum(class_loss))
+        dW = (1 / n_samples) * self._gradient(X, P - Y) + (self.lambda_param / n_samples) * W
+        db = (1 / n_samples) * np.sum(P - Y, axis=0)
+        return loss, np.concatenate([np.ravel(dW), db]), class_loss
+
+    def _initial_theta(self, n_features):
+        K = len(self.classes_)
+        if self.warm_start and self.models and all(c in self.models for c in self.classes_):
+            W = np.vstack([np.asarray(self.models[c]['weights'], dtype=float) for c in self.classes_])
+            b = np.array([self.models[c]['bias'] for c in self.classes_], dtype=float)
+            if W.shape == (K, n_features):
+                return np.concatenate([W.ravel(), b])
+        return np.zeros(K * n_features + K)
+
+    def _fit_lbfgs(self, X, y, verbose=False):
+        n_features = X.shape[1]
+        K = len(self.classes_)
+        Y = self._one_hot(y)
+        theta = self._initial_theta(n_features)
+        self.models = {}
+        self.loss_history = {}
+
+        loss, grad, class_loss = self._objective(theta, X, Y)
+        s_hist, y_hist, rho_hist = [], [], []
+        loss_hist = [class_loss]
+        self.n_iter_ = 0
+        self.converged_ = False
+
+        for iteration in range(self.n_iters):
+            if np.max(np.abs(grad)) <= self.tol:
+                self.converged_ = True
+                break
+
+            # Two-loop recursion: hướng đi d = -H * grad
+            q = grad.copy()
+            alphas = []
+            for s_k, y_k, rho_k in zip(reversed(s_hist), reversed(y_hist), reversed(rho_hist)):
+                a = rho_k * np.dot(s_k, q)
+                q -= a * y_k
+                alphas.append(a)
+            if s_hist:
+                q *= np.dot(s_hist[-1], y_hist[-1]) / np.dot(y_hist[-1], y_hist[-1])
+            else:
+                q /= max(np.linalg.norm(q), 1.0)  # bước đầu tiên: chuẩn hoá độ dài
+            for (s_k, y_k, rho_k), a in zip(zip(s_hist, y_hist, rho_hist), reversed(alphas)):
+                q += s_k * (a - rho_k * np.dot(y_k, q))
+            direction = -q
+
+            slope = np.dot(grad, direction)
+            if slope >= 0:
+                # Không phải hướng giảm -> xoá bộ nhớ, quay về gradient
+                s_hist, y_hist, rho_hist = [], [], []
+                direction = -grad
+                slope = -np.dot(grad, grad)
+
+            # Backtracking line search (điều kiện Armijo): loss chỉ được tính ở đây
+            step = 1.0
+            while step >= 1e-10:
+                theta_new = theta + step * direction
+                loss_new, grad_new, class_loss_new = self._objective(theta_new, X, Y)
+                if loss_new <= loss + 1e-4 * step * slope:
+                    break
+                step *= 0.5
+            else:
+                # Line search thất bại: giữ nguyên điểm hiện tại (không nhận điểm có loss lớn hơn)
+                self.converged_ = np.max(np.abs(grad)) <= self.tol
+                break
+
+            s_k = theta_new - theta
+            y_k = grad_new - grad
+            sy = np.dot(s_k, y_k)
+            if sy > 1e-10:
+                s_hist.append(s_k)
+                y_hist.append(y_k)
+                rho_hist.append(1.0 / sy)
+                if len(s_hist) > self.history_size:
+                    s_hist.pop(0)
+                    y_hist.pop(0)
+                    rho_hist.pop(0)
+
+            decrease = loss - loss_new
+            theta, loss, grad = theta_new, loss_new, grad_new
+            loss_hist.append(class_loss_new)
+            self.n_iter_ = iteration + 1
+
+            if verbose and iteration % 10 == 0:
+                print(f"Iteration {iteration}, Loss: {loss:.6f}, |grad|: {np.max(np.abs(grad)):.2e}")
+
+            if decrease <= 1e-12 * max(abs(loss), 1.0):
+                # Không giảm thêm được nữa
+                self.converged_ = np.max(np.abs(grad)) <= self.tol
+                break
+        else:
+            self.converged_ = np.max(np.abs(grad)) <= self.tol
+
+        W = theta[:K * n_features].reshape(K, n_features).copy()
+        b = theta[K * n_features:].copy()
+        self._set_params(W, b)
+        # Cùng dạng với 'gd': OvR -> loss theo từng lớp, multinomial -> một loss chung
+        if self.multi_class == 'multinomial':
+            self.loss_history['multinomial'] = [float(l) for l in loss_hist]
+        else:
+            self.loss_history = {cls: [float(l[idx]) for l in loss_hist] for idx, cls in enumerate(self.classes_)}
+        self.t_ = 0
+        self.n_samples_seen_ = X.shape[0]
+        return self
+
+    @instrumentation.timed('lr_fit', items=lambda self, X, y, *args, **kwargs: len(y))
     def fit(self, X, y, verbose=False):
-        """X: features, y: labels (0,1,2,...K-1)"""
+        """X: features (dense, np.memmap hoặc scipy CSR), y: labels (0,1,2,...K-1)"""
+        X = _check_X(X)
         self.classes_ = np.unique(y)
+        if self.solver == 'lbfgs':
+            return self._fit_lbfgs(X, y, verbose)
+        # warm_start: lấy weights cũ TRƯỚC khi xoá self.models
+        K, n_features = len(self.classes_), X.shape[1]
+        theta = self._initial_theta(n_features)
+        W = theta[:K * n_features].reshape(K, n_features).copy()
+        b = theta[K * n_features:].copy()
         self.models = {}
         self.loss_history = {}
 
-        for cls in self.classes_:
+        if self.solver == 'sgd':
+            return self._fit_sgd(X, y, verbose)
+
+        # Cho phép partial_fit học tiếp sau khi fit toàn bộ
+        self.t_ = 0
+        self.n_samples_seen_ = X.shape[0]
+
+        if self.multi_class != 'ovr':
+            if verbose:
+                print(f"Training {self.multi_class} model for {len(self.classes_)} classes...")
+            W, b, loss_hist = self._fit_matrix(X, self._one_hot(y), verbose, W, b)
+            self._set_params(W, b)
+            if self.multi_class == 'multinomial':
+                self.loss_history['multinomial'] = list(loss_hist)
+            else:
+                self.loss_history = {cls: list(loss_hist[:, idx]) for idx, cls in enumerate(self.classes_)}
+            return self
+
+        for idx, cls in enumerate(self.classes_):
             if verbose:
                 print(f"Training OvR model for class {cls}...")
             # Nhãn nhị phân: cls vs rest
             y_binary = (y == cls).astype(int)
-            weights, bias, loss_hist = self._fit_binary(X, y_binary, verbose)
-            self.models[cls] = {'weights': weights, 'bias': bias}
+            weights, bias, loss_hist = self._fit_binary(X, y_binary, verbose, label=cls,
+                                                        weights=W[idx], bias=b[idx])
+            W[idx] = weights
+            b[idx] = bias
             self.loss_history[cls] = loss_hist
+        self._set_params(W, b)
+        return self
 
     def predict_proba(self, X):
-        """Trả về xác suất cho từng lớp"""
-        proba = np.zeros((X.shape[0], len(self.classes_)))
-        for idx, cls in enumerate(self.classes_):
-            weights = self.models[cls]['weights']
-            bias = self.models[cls]['bias']
-            proba[:, idx] = self._sigmoid(np.dot(X, weights) + bias)
-        return proba
+        """Trả về xác suất cho từng lớp (1 phép nhân ma trận cho mọi lớp)"""
+        X = _check_X(X)
+        return self._predict_matrix(X, self.coef_, self.intercept_)
 
     def predict(self, X):
         """Dự đoán nhãn: chọn lớp có xác suất cao nhất"""
@@ -81,49 +480,97 @@ class LogisticRegression:
 # ==============================================================================
 
 class MultinomialNB:
+    """
+    Multinomial Naive Bayes. Có thể fit một lần hoặc học dần bằng partial_fit():
+    chỉ cần cộng dồn _feature_counts / _sample_counts, log-prob được tính lại khi cần.
+    """
+
     def __init__(self, alpha=1.0):
         self.alpha = alpha
 
-    def fit(self, X, y):
-        n_samples, n_features = X.shape
-        self._classes = np.unique(y)
-        n_classes = len(self._classes)
+    def _one_hot(self, y):
+        return (np.asarray(y).reshape(-1, 1) == self._classes.reshape(1, -1)).astype(float)
 
-        # 1. Tính toán số lượng (Counts)
+    def _init_counts(self, classes, n_features):
+        self._classes = np.unique(classes)
+        self.classes_ = self._classes
+        n_classes = len(self._classes)
         self._feature_counts = np.zeros((n_classes, n_features))
-        self._class_counts = np.zeros(n_classes)
-        self._priors = np.zeros(n_classes)
+        self._sample_counts = np.zeros(n_classes)  # số mẫu mỗi lớp (để tính prior)
 
-        for idx, c in enumerate(self._classes):
-            X_c = X[y == c]
-            self._feature_counts[idx, :] = np.sum(X_c, axis=0)
-            self._class_counts[idx] = np.sum(self._feature_counts[idx, :])
-            self._priors[idx] = X_c.shape[0] / n_samples
+    def _accumulate(self, X, y):
+        # 1. Tính toán số lượng (Counts) trong MỘT lượt: Y_onehot.T @ X -> (n_classes, n_features)
+        # thay vì tạo bản sao X[y == c] cho từng lớp
+        Y = self._one_hot(y)
+        if _issparse(X):
+            self._feature_counts += (X.T @ Y).T
+        else:
+            self._feature_counts += Y.T @ X
+        self._sample_counts += Y.sum(axis=0)
+        self._stale = True
 
+    def _update_log_prob(self):
         # 2. TÍNH TOÁN TRƯỚC (Pre-compute) Log Probabilities
-        # Thay vì tính lúc predict, ta tính luôn lúc fit để dùng lại
         # Công thức: log(count + alpha) - log(total_count + alpha * n_features)
-        
+        n_features = self._feature_counts.shape[1]
+        self._class_counts = self._feature_counts.sum(axis=1)
+        self._priors = self._sample_counts / self._sample_counts.sum()
+
         numerator = self._feature_counts + self.alpha
         # Reshape _class_counts để broadcasting (n_classes, 1)
         denominator = self._class_counts.reshape(-1, 1) + (self.alpha * n_features)
-        
+
         # Ma trận (n_classes, n_features) chứa xác suất log của từng từ trong từng class
         self._feature_log_prob = np.log(numerator) - np.log(denominator)
-        
-        # Log Prior
-        self._class_log_prior = np.log(self._priors)
 
-    def predict(self, X):
+        # Log Prior (lớp chưa có mẫu nào -> -inf)
+        with np.errstate(divide='ignore'):
+            self._class_log_prior = np.log(self._priors)
+        self._stale = False
+
+    @instrumentation.timed('nb_fit', items=lambda self, X, y: len(y))
+    def fit(self, X, y):
+        X = _check_X(X)
+        self._init_counts(y, X.shape[1])
+        self._accumulate(X, y)
+        self._update_log_prob()
+        return self
+
+    def partial_fit(self, X, y, classes=None):
+        """
+        Cộng dồn số đếm từ một batch mới mà không cần fit lại từ đầu.
+        - classes: danh sách mọi nhãn, bắt buộc ở lần gọi đầu tiên
+        """
+        X = _check_X(X)
+        if not hasattr(self, '_feature_counts'):
+            if classes is None:
+                raise ValueError("Lần gọi partial_fit đầu tiên cần truyền classes")
+            self._init_counts(classes, X.shape[1])
+        elif classes is not None and not np.array_equal(np.unique(classes), self._classes):
+            raise ValueError("classes khác với lần gọi partial_fit trước")
+        self._accumulate(X, y)
+        return self
+
+    def _joint_log_likelihood(self, X):
         # 3. DỰ ĐOÁN BẰNG NHÂN MA TRẬN (Vectorization)
         # Công thức: Posterior = Log(Prior) + X . Log(Feature_Prob)^T
-        # X: (n_samples, n_features)
-        # _feature_log_prob.T: (n_features, n_classes)
         # Kết quả jll (Joint Log Likelihood): (n_samples, n_classes)
-        
-        jll = np.dot(X, self._feature_log_prob.T) + self._class_log_prior
-        
-        # Lấy chỉ số của class có xác suất lớn nhất
-        return self._classes[np.argmax(jll, axis=1)]
+        if self._stale:
+            self._update_log_prob()
+        X = _check_X(X)
+        return X @ self._feature_log_prob.T + self._class_log_prior
 
+    def predict_log_proba(self, X):
+        """log P(class | x), chuẩn hoá bằng log-sum-exp để không bị tràn số."""
+        jll = self._joint_log_likelihood(X)
+        jll_max = jll.max(axis=1, keepdims=True)
+        log_norm = jll_max + np.log(np.sum(np.exp(jll - jll_max), axis=1, keepdims=True))
+        return jll - log_norm
 
+    def predict_proba(self, X):
+        return np.exp(self.predict_log_proba(X))
+
+    def predict(self, X):
+        jll = self._joint_log_likelihood(X)
+        # Lấy chỉ số của class có xác suất lớn nhất
+        return self._classes[np.argmax(jll, axis=1)]
@@ -0,0 +1,28 @@
+import argparse
+import sys
+
+from src.data_processing import check_clean_text_parity
+
+
+# ================================================================================================
+# CLI: python -m src.parity [--n 100000] [--seed 0]
+# ================================================================================================
+# clean_text_fast (engine mặc định của clean_texts / pipeline) phải cho output GIỐNG HỆT clean_text.
+# Chạy sau mỗi lần sửa clean_text, EMOJI_MAP, MY_STOP_WORDS hoặc các pattern của engine "fast".
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kiểm tra clean_text_fast cho cùng output với clean_text")
+    parser.add_argument('--n', type=int, default=100_000, help="số chuỗi ngẫu nhiên")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    mismatches = check_clean_text_parity(n=args.n, seed=args.seed)
+    if mismatches:
+        text, expected, actual = mismatches[0]
+        print(f"LỖI: {len(mismatches)} chuỗi lệch, ví dụ {text!r}: {expected!r} != {actual!r}")
+        return 1
+    print(f"OK: clean_text_fast == clean_text trên {args.n:,} chuỗi (seed={args.seed})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,510 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import src.instrumentation as instrumentation
+from src.cache import RowCache, hash_config
+from src.config import (COMPREHENSIVE_MAPPING, DIR_PATH_PIPELINE, EMOJI_MAP, FILE_PATH_VACCINENATION_TWEETS,
+                        IMPUTE_LOCATION, NEGATION_WORDS, NEGATIVE_WORDS, POSITIVE_WORDS)
+from src.corpus import generate_sentiment_labels
+from src.data_processing import MY_STOP_WORDS, STEM_CACHE, clean_texts, count_hashtags, count_mentions, process_hashtag
+from src.dedup import DEFAULT_NUM_PERM, DEFAULT_SHINGLE_SIZE, MinHashLSH
+from src.features import CSRArrays, HashingTfidf, HashingVectorizer, TfidfTransformer, stack_csr, to_csr
+from src.ingest import TWEET_SCHEMA, load_tweets
+from src.location import map_locations
+from src.models import LogisticRegression, MultinomialNB
+from src.serving import SENTIMENT_NAMES, save_predictor
+from src.stopwords import ENGLISH_STOP_WORDS
+from src.storage import SCHEMA_FILE, load_columns, save_columns
+
+
+# ================================================================================================
+# CONTENT HASH
+# ================================================================================================
+# Mỗi stage được định danh bằng hash của: tên + version của stage, config liên quan (từ điển,
+# EMOJI_MAP, COMPREHENSIVE_MAPPING, siêu tham số...) và hash của các stage đầu vào.
+# Sửa POSITIVE_WORDS -> hash của 'label' đổi -> 'train', 'evaluate' đổi theo,
+# còn 'ingest', 'clean', 'dedup', 'vectorize'... giữ nguyên hash nên được bỏ qua.
+# 'dedup' gom tweet gần trùng lặp (src/dedup.py): 'label', 'vectorize', 'train' chỉ xử lý tweet đại diện.
+# Khi dữ liệu thô đổi (bản dump mới), 'location', 'clean', 'label' vẫn phải chạy lại nhưng chỉ tính
+# các tweet mới/bị sửa nhờ RowCache (src/cache.py) đặt trong <out_dir>/rows/<stage>/.
+# Bảng word -> stem (StemCache) được giữ ở <out_dir>/clean/stem_table/, cạnh kết quả của 'clean',
+# để lần chạy sau (kể cả khi hash 'clean' đổi) không phải stem lại các từ đã gặp.
+MANIFEST_FILE = 'stage.json'
+ROW_CACHE_DIR = 'rows'
+STEM_TABLE_DIR = 'stem_table'
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """sha256 nội dung file (đọc theo chunk, không nạp cả file vào bộ nhớ)."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ================================================================================================
+# FEATURE DERIVATION (notebook 01)
+# ================================================================================================
+NO_HASHTAG = 'no_hashtag'
+ACC_CLASSES = ('weak', 'norm', 'strong', 'influencer')
+
+
+def derive_features(data):
+    """
+    Các cột dẫn xuất của notebook 01 từ dữ liệu thô (dict cột hoặc Structured Array):
+    engagement, reputation_ratio, acc_class, acc_age, hashtags (đã chuẩn hoá),
+    hashtags_count, mentions_count, tweet_lengths.
+    """
+    followers = np.asarray(data['user_followers']).astype(np.float64)
+    friends = np.asarray(data['user_friends']).astype(np.float64)
+
+    conditions = [
+        followers <= 100,
+        (followers > 100) & (followers <= 1000),
+        (followers > 1000) & (followers <= 10000),
+        followers > 10000,
+    ]
+
+    hashtags = []
+    for tag_string in data['hashtags']:
+        if not tag_string.strip() or tag_string == NO_HASHTAG:
+            hashtags.append(NO_HASHTAG)
+        else:
+            hashtags.append(process_hashtag(tag_string))
+    texts = list(data['text'])
+
+    return {
+        'engagement': np.asarray(data['retweets']).astype(np.float64) + np.asarray(data['favorites']),
+        'reputation_ratio': followers / (friends + 1),
+        'acc_class': np.select(conditions, ACC_CLASSES, default='unknown'),
+        'acc_age': np.asarray(data['date']) - np.asarray(data['user_created']),
+        'hashtags': np.array(hashtags, dtype=object),
+        'hashtags_count': np.array([count_hashtags(t) for t in hashtags], dtype=np.int64),
+        'mentions_count': np.array([count_mentions(t) for t in texts], dtype=np.int64),
+        'tweet_lengths': np.array([len(t) for t in texts], dtype=np.int64),
+    }
+
+
+# ================================================================================================
+# CHIA TẬP + ĐÁNH GIÁ
+# ================================================================================================
+def stratified_split(y, test_size=0.2, seed=42):
+    """Mask tập test: lấy ngẫu nhiên (cố định theo seed) `test_size` số dòng của TỪNG nhãn."""
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    is_test = np.zeros(len(y), dtype=bool)
+    for cls in np.unique(y):
+        rows = rng.permutation(np.flatnonzero(y == cls))
+        is_test[rows[:int(round(len(rows) * test_size))]] = True
+    return is_test
+
+
+def classification_metrics(y_true, y_pred, n_classes=3, weights=None):
+    """
+    accuracy, macro F1, confusion matrix và precision/recall/F1 từng nhãn (thay cho sklearn.metrics).
+    - weights: trọng số từng dòng (vd. kích thước cụm gần trùng lặp) -> số liệu tính trên toàn bộ tweet
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    cm = np.bincount(y_true * n_classes + y_pred, weights=weights,
+                     minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+    if weights is None:
+        cm = cm.astype(np.int64)
+    tp = np.diag(cm).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.nan_to_num(tp / cm.sum(axis=0))
+        recall = np.nan_to_num(tp / cm.sum(axis=1))
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    per_class = {
+        str(c): {'precision': precision[c], 'recall': recall[c], 'f1': f1[c], 'support': int(cm[c].sum())}
+        for c in range(n_classes)
+    }
+    return {
+        'accuracy': float(tp.sum() / max(cm.sum(), 1)),
+        'macro_f1': float(f1.mean()),
+        'confusion_matrix': cm.tolist(),
+        'per_class': {c: {k: float(v) for k, v in m.items()} for c, m in per_class.items()},
+    }
+
+
+# ================================================================================================
+# STAGES
+# ================================================================================================
+DEFAULT_PARAMS = {
+    'engine': 'fast',            # clean_text_fast, cùng kết quả với clean_text
+    'n_features': 1 << 16,
+    'ngram_range': (1, 1),
+    'sublinear_tf': False,
+    'test_size': 0.2,
+    'seed': 42,
+    # Siêu tham số như notebook 03
+    'learning_rate': 0.1,
+    'n_iters': 2000,
+    'lambda_param': 0.01,
+    'alpha': 1.0,
+    # Gom tweet gần trùng lặp (Jaccard shingle >= ngưỡng) trước khi gán nhãn / huấn luyện; None = không gom
+    'dedup_threshold': 0.8,
+}
+
+MODELS = {
+    'logistic_regression': lambda params: LogisticRegression(
+        learning_rate=params['learning_rate'], n_iters=params['n_iters'], lambda_param=params['lambda_param']),
+    'naive_bayes': lambda params: MultinomialNB(alpha=params['alpha']),
+}
+
+# Notebook 03: stop word tiếng Anh nhưng giữ lại từ phủ định
+VECTORIZER_STOP_WORDS = ENGLISH_STOP_WORDS - NEGATION_WORDS
+
+# - deps: các stage đầu vào
+# - config(pipeline): dict config ảnh hưởng tới kết quả của stage (đưa vào hash)
+# - run(pipeline, out_dir): tính và ghi kết quả vào out_dir
+# - version: tăng lên khi sửa logic của stage để các kết quả cũ tự hết hiệu lực
+Stage = namedtuple('Stage', ['name', 'deps', 'config', 'run', 'version'])
+
+
+def _run_ingest(p, out):
+    save_columns(out, load_tweets(p.raw_path))
+
+
+def _run_features(p, out):
+    data = p.load('ingest', ['user_followers', 'user_friends', 'retweets', 'favorites',
+                             'date', 'user_created', 'hashtags', 'text'])
+    save_columns(out, derive_features(data))
+
+
+def _run_location(p, out):
+    ids = p.load('ingest', ['id'])['id']
+    locations = p.load('ingest', ['user_location'])['user_location'].to_numpy()
+    result = p.cached('location', ['user_location'], ids, locations, lambda values: {
+        'user_location': map_locations(np.array(values, dtype=str), COMPREHENSIVE_MAPPING, IMPUTE_LOCATION)})
+    save_columns(out, result)
+
+
+def _run_clean(p, out):
+    ids = p.load('ingest', ['id'])['id']
+    texts = list(p.load('ingest', ['text'])['text'])
+    stem_table = os.path.join(p.out_dir, 'clean', STEM_TABLE_DIR)
+    if os.path.exists(os.path.join(stem_table, SCHEMA_FILE)):
+        STEM_CACHE.load(stem_table)
+    result = p.cached('clean', ['clean_text'], ids, texts, lambda values: {
+        'clean_text': np.array(clean_texts(values, workers=p.workers, engine=p.params['engine']), dtype=object)})
+    save_columns(out, result)
+    STEM_CACHE.save(stem_table)
+
+
+def _run_dedup(p, out):
+    cleaned = list(p.load('clean', ['clean_text'])['clean_text'])
+    threshold = p.params['dedup_threshold']
+    if threshold is None:
+        cluster = np.arange(len(cleaned), dtype=np.int64)
+        representatives = cluster
+        weights = np.ones(len(cleaned), dtype=np.int64)
+    else:
+        cluster, representatives, weights = MinHashLSH(threshold).fit(cleaned)
+
+    # Theo từng tweet: weight = số tweet trong cụm nếu là đại diện, 0 nếu không
+    weight = np.zeros(len(cleaned), dtype=np.int64)
+    weight[representatives] = weights
+    save_columns(out, {'cluster': cluster, 'is_representative': weight > 0, 'weight': weight})
+    p.log(f"[{'dedup':<10}] {len(cleaned):,} tweet -> {len(representatives):,} cụm "
+          f"({1 - len(representatives) / max(len(cleaned), 1):.1%} gần trùng lặp)")
+
+
+def _run_label(p, out):
+    # Chỉ gán nhãn tweet đại diện, các tweet cùng cụm nhận nhãn của đại diện
+    rows = p.representatives()
+    ids = np.asarray(p.load('ingest', ['id'])['id'])[rows]
+    cleaned = p.load('clean', ['clean_text'])['clean_text'][rows]
+    result = p.cached('label', ['sentiment_label'], ids, cleaned, lambda values: {
+        'sentiment_label': generate_sentiment_labels(values)})
+    cluster = np.asarray(p.load('dedup', ['cluster'])['cluster'])
+    save_columns(out, {'sentiment_label': np.asarray(result['sentiment_label'])[cluster]})
+
+
+def _run_vectorize(p, out):
+    # Ma trận chỉ gồm tweet đại diện (dòng i <-> tweet p.representatives()[i])
+    cleaned = list(p.load('clean', ['clean_text'])['clean_text'][p.representatives()])
+    n_features = p.params['n_features']
+    hashing = HashingVectorizer(n_features, ngram_range=tuple(p.params['ngram_range']), alternate_sign=False,
+                                stop_words=VECTORIZER_STOP_WORDS, norm=None)
+    counts = stack_csr(hashing.iter_transform_arrays(cleaned, workers=p.workers), n_features)
+    tfidf = TfidfTransformer(sublinear_tf=p.params['sublinear_tf']).fit(counts)
+    X = tfidf.transform_arrays(counts)
+
+    # indptr (n_rows + 1) và indices/data (nnz) khác độ dài -> 2 store riêng
+    save_columns(os.path.join(out, 'indptr'), {'indptr': X.indptr})
+    save_columns(os.path.join(out, 'nnz'), {'indices': X.indices, 'data': X.data})
+    with open(os.path.join(out, 'vectorizer.pkl'), 'wb') as f:
+        pickle.dump(HashingTfidf(hashing, tfidf), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _run_train(p, out):
+    X = to_csr(p.load_matrix())
+    y = np.asarray(p.load('label')['sentiment_label'])[p.representatives()]
+    is_test = stratified_split(y, p.params['test_size'], p.params['seed'])
+    with open(os.path.join(p.stage_dir('vectorize'), 'vectorizer.pkl'), 'rb') as f:
+        vectorizer = pickle.load(f)
+
+    for name, make_model in MODELS.items():
+        model = make_model(p.params)
+        model.fit(X[~is_test], y[~is_test])
+        # File pickle dùng thẳng được với `python -m src.serving --model ...`
+        save_predictor(os.path.join(out, name + '.pkl'), model, vectorizer)
+    save_columns(out, {'is_test': is_test})
+
+
+def _run_evaluate(p, out):
+    X = to_csr(p.load_matrix())
+    rows = p.representatives()
+    y = np.asarray(p.load('label')['sentiment_label'])[rows]
+    weight = np.asarray(p.load('dedup', ['weight'])['weight'])[rows]
+    is_test = np.asarray(p.load('train')['is_test'])
+
+    metrics = {}
+    predictions = {'row': rows[is_test]}
+    for name in MODELS:
+        with open(os.path.join(p.stage_dir('train'), name + '.pkl'), 'rb') as f:
+            model = pickle.load(f)['model']
+        y_pred = np.asarray(model.predict(X[is_test]))
+        predictions[name] = y_pred
+        metrics[name] = classification_metrics(y[is_test], y_pred, len(SENTIMENT_NAMES))
+        # Số liệu trên toàn bộ tweet: mỗi đại diện được tính bằng số tweet trong cụm của nó
+        population = classification_metrics(y[is_test], y_pred, len(SENTIMENT_NAMES), weights=weight[is_test])
+        metrics[name]['population'] = {k: population[k] for k in ('accuracy', 'macro_f1')}
+    save_columns(out, predictions)
+    with open(os.path.join(out, 'metrics.json'), 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+
+
+_STAGE_LIST = [
+    Stage('ingest', (), lambda p: {'raw': p.raw_hash(), 'schema': TWEET_SCHEMA}, _run_ingest, 1),
+    Stage('features', ('ingest',), lambda p: {'acc_classes': ACC_CLASSES}, _run_features, 1),
+    Stage('location', ('ingest',), lambda p: {'mapping': COMPREHENSIVE_MAPPING, 'impute': IMPUTE_LOCATION},
+          _run_location, 1),
+    Stage('clean', ('ingest',), lambda p: {'emoji_map': EMOJI_MAP, 'stop_words': MY_STOP_WORDS,
+                                           'engine': p.params['engine']}, _run_clean, 1),
+    Stage('dedup', ('clean',), lambda p: {'threshold': p.params['dedup_threshold'], 'num_perm': DEFAULT_NUM_PERM,
+                                          'shingle_size': DEFAULT_SHINGLE_SIZE}, _run_dedup, 1),
+    Stage('label', ('ingest', 'clean', 'dedup'), lambda p: {'positive': POSITIVE_WORDS, 'negative': NEGATIVE_WORDS,
+                                                   'negation': NEGATION_WORDS}, _run_label, 1),
+    Stage('vectorize', ('clean', 'dedup'), lambda p: {'n_features': p.params['n_features'], 'ngram_range': p.params['ngram_range'],
+                                              'sublinear_tf': p.params['sublinear_tf'],
+                                              'stop_words': VECTORIZER_STOP_WORDS}, _run_vectorize, 1),
+    Stage('train', ('vectorize', 'label'), lambda p: {k: p.params[k] for k in (
+        'test_size', 'seed', 'learning_rate', 'n_iters', 'lambda_param', 'alpha')}, _run_train, 1),
+    Stage('evaluate', ('train', 'vectorize', 'label', 'dedup'), lambda p: {}, _run_evaluate, 1),
+]
+STAGES = {stage.name: stage for stage in _STAGE_LIST}
+
+
+# ================================================================================================
+# RUNNER
+# ================================================================================================
+class Pipeline:
+    """
+    Chạy các stage theo thứ tự phụ thuộc, kết quả mỗi stage nằm ở <out_dir>/<stage>/<hash[:16]>/.
+    Stage nào đã có kết quả cho đúng hash thì bỏ qua, nên chạy lại sau khi sửa một từ điển
+    chỉ tính lại các stage phía sau nó.
+
+        p = Pipeline(params={'lambda_param': 0.1})
+        p.run()                   # hoặc p.run(until='label')
+        p.load('label')['sentiment_label']
+
+    - row_cache: dùng RowCache cho 'location', 'clean', 'label' (chỉ tính tweet mới/bị sửa)
+    """
+
+    def __init__(self, raw_path=FILE_PATH_VACCINENATION_TWEETS, out_dir=DIR_PATH_PIPELINE, params=None,
+                 workers=None, row_cache=True, log=print):
+        unknown = set(params or {}) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Tham số không hợp lệ: {sorted(unknown)}")
+        self.raw_path = raw_path
+        self.out_dir = out_dir
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.workers = workers  # không ảnh hưởng kết quả -> không đưa vào hash
+        self.row_cache = row_cache
+        self.log = log
+        self._raw_hash = None
+        self._keys = {}
+        self._row_stats = {}
+
+    def raw_hash(self):
+        if self._raw_hash is None:
+            self._raw_hash = hash_file(self.raw_path)
+        return self._raw_hash
+
+    def key(self, name):
+        if name not in self._keys:
+            stage = STAGES[name]
+            self._keys[name] = hash_config({
+                'stage': name,
+                'version': stage.version,
+                'config': stage.config(self),
+                'inputs': {dep: self.key(dep) for dep in stage.deps},
+            })
+        return self._keys[name]
+
+    def config_key(self, name):
+        """Hash của version + config của stage, KHÔNG gồm dữ liệu đầu vào (dùng làm version của RowCache)."""
+        stage = STAGES[name]
+        return hash_config({'stage': name, 'version': stage.version, 'config': stage.config(self)})
+
+    def cached(self, name, columns, ids, values, compute):
+        """compute(values) qua RowCache của stage `name` (hoặc tính thẳng khi row_cache=False)."""
+        if not self.row_cache:
+            return compute(list(values))
+        cache = RowCache(os.path.join(self.out_dir, ROW_CACHE_DIR, name), self.config_key(name), columns)
+        result = cache.apply(ids, values, compute)
+        self._row_stats[name] = cache.stats()
+        self.log(f"[{name:<10}] row cache: {cache.hits:,}/{cache.hits + cache.misses:,} dòng có sẵn "
+                 f"({cache.hit_ratio:.1%})")
+        return result
+
+    def stage_dir(self, name):
+        return os.path.join(self.out_dir, name, self.key(name)[:16])
+
+    def is_done(self, name):
+        manifest = os.path.join(self.stage_dir(name), MANIFEST_FILE)
+        if not os.path.exists(manifest):
+            return False
+        with open(manifest, 'r', encoding='utf-8') as f:
+            return json.load(f).get('key') == self.key(name)
+
+    def load(self, name, columns=None):
+        """Cột kết quả của một stage (memory-mapped)."""
+        return load_columns(self.stage_dir(name), columns)
+
+    def representatives(self):
+        """Chỉ số (theo thứ tự tweet) các tweet đại diện của stage 'dedup'."""
+        return np.flatnonzero(np.asarray(self.load('dedup', ['is_representative'])['is_representative']))
+
+    def load_matrix(self):
+        """Ma trận TF-IDF (các tweet đại diện) của stage 'vectorize' dạng CSRArrays."""
+        path = self.stage_dir('vectorize')
+        indptr = load_columns(os.path.join(path, 'indptr'))['indptr']
+        nnz = load_columns(os.path.join(path, 'nnz'))
+        return CSRArrays(np.asarray(indptr), np.asarray(nnz['indices']), np.asarray(nnz['data']),
+                         (len(indptr) - 1, self.params['n_features']))
+
+    def required(self, until=None):
+        """Danh sách stage cần có để tính `until` (None = tất cả), theo thứ tự chạy."""
+        if until is None:
+            return list(STAGES)
+        needed = set()
+        stack = [until]
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(STAGES[name].deps)
+        return [name for name in STAGES if name in needed]
+
+    def status(self, until=None):
+        return {name: self.is_done(name) for name in self.required(until)}
+
+    def run(self, until=None, force=()):
+        """
+        Chạy các stage cần thiết. `force`: tên các stage phải tính lại dù đã có kết quả
+        (hash không đổi nên stage phía sau vẫn được dùng lại).
+        Trả về list {'stage', 'status' ('cached' | 'ran'), 'seconds', 'key'}.
+        """
+        report = []
+        for name in self.required(until):
+            key = self.key(name)
+            if name not in force and self.is_done(name):
+                report.append({'stage': name, 'status': 'cached', 'seconds': 0.0, 'key': key})
+                self.log(f"[{name:<10}] dùng lại {key[:16]}")
+                continue
+
+            out = self.stage_dir(name)
+            if os.path.exists(out):
+                shutil.rmtree(out)  # kết quả dở dang của lần chạy bị ngắt
+            os.makedirs(out)
+            t0 = time.perf_counter()
+            with instrumentation.stage('pipeline_' + name):
+                STAGES[name].run(self, out)
+            seconds = time.perf_counter() - t0
+            self._write_manifest(name, seconds)
+            report.append({'stage': name, 'status': 'ran', 'seconds': seconds, 'key': key,
+                           **({'row_cache': self._row_stats[name]} if name in self._row_stats else {})})
+            self.log(f"[{name:<10}] chạy xong {seconds:.2f}s -> {out}")
+        return report
+
+    def _write_manifest(self, name, seconds):
+        # Manifest ghi SAU CÙNG (tmp + rename): có manifest đúng hash = stage đã hoàn tất
+        manifest = {
+            'stage': name,
+            'key': self.key(name),
+            'inputs': {dep: self.key(dep) for dep in STAGES[name].deps},
+            'seconds': seconds,
+            **({'row_cache': self._row_stats[name]} if name in self._row_stats else {}),
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        path = os.path.join(self.stage_dir(name), MANIFEST_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def metrics(self):
+        with open(os.path.join(self.stage_dir('evaluate'), 'metrics.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+# ================================================================================================
+# CLI: python -m src.pipeline [--until label] [--force clean] [--lambda-param 0.1]
+# ================================================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chạy pipeline ingest -> ... -> evaluate, bỏ qua stage không đổi")
+    parser.add_argument('--raw', default=FILE_PATH_VACCINENATION_TWEETS, help="file CSV thô")
+    parser.add_argument('--out', default=DIR_PATH_PIPELINE, help="thư mục lưu kết quả các stage")
+    parser.add_argument('--until', choices=list(STAGES), help="chỉ chạy tới stage này (kèm các stage nó cần)")
+    parser.add_argument('--force', nargs='*', default=[], choices=list(STAGES), help="tính lại các stage này")
+    parser.add_argument('--status', action='store_true', help="chỉ in stage nào đã có kết quả, không chạy")
+    parser.add_argument('--workers', type=int, default=None, help="số process (mặc định = số CPU)")
+    parser.add_argument('--no-row-cache', action='store_true', help="tính lại mọi dòng, không dùng cache theo tweet")
+    parser.add_argument('--engine', default=DEFAULT_PARAMS['engine'], choices=['fast', 'reference'])
+    parser.add_argument('--n-features', type=int, default=DEFAULT_PARAMS['n_features'])
+    parser.add_argument('--test-size', type=float, default=DEFAULT_PARAMS['test_size'])
+    parser.add_argument('--seed', type=int, default=DEFAULT_PARAMS['seed'])
+    parser.add_argument('--learning-rate', type=float, default=DEFAULT_PARAMS['learning_rate'])
+    parser.add_argument('--n-iters', type=int, default=DEFAULT_PARAMS['n_iters'])
+    parser.add_argument('--lambda-param', type=float, default=DEFAULT_PARAMS['lambda_param'])
+    parser.add_argument('--alpha', type=float, default=DEFAULT_PARAMS['alpha'])
+    parser.add_argument('--dedup-threshold', type=float, default=DEFAULT_PARAMS['dedup_threshold'],
+                        help="ngưỡng Jaccard gom tweet gần trùng lặp")
+    parser.add_argument('--no-dedup', action='store_true', help="không gom tweet gần trùng lặp")
+    args = parser.parse_args(argv)
+
+    params = {name: getattr(args, name) for name in ('engine', 'n_features', 'test_size', 'seed',
+                                                     'learning_rate', 'n_iters', 'lambda_param', 'alpha',
+                                                     'dedup_threshold')}
+    if args.no_dedup:
+        params['dedup_threshold'] = None
+    pipeline = Pipeline(args.raw, args.out, params, workers=args.workers, row_cache=not args.no_row_cache)
+
+    if args.status:
+        for name, done in pipeline.status(args.until).items():
+            print(f"{name:<10} {'có kết quả' if done else 'cần chạy':<12} {pipeline.key(name)[:16]}")
+        return
+
+    report = pipeline.run(args.until, force=set(args.force))
+    n_ran = sum(r['status'] == 'ran' for r in report)
+    print(f"\n{n_ran}/{len(report)} stage được tính lại, {sum(r['seconds'] for r in report):.2f}s")
+
+    if args.until in (None, 'evaluate'):
+        print(f"\n{'Model':<22} {'Accuracy':>10} {'Macro F1':>10}")
+        for name, m in pipeline.metrics().items():
+            print(f"{name:<22} {m['accuracy']:>10.2%} {m['macro_f1']:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
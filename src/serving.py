@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import pickle
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.data_processing import clean_text_fast
+
+
+# ================================================================================================
+# PREDICTOR (model + vectorizer, nạp một lần)
+# ================================================================================================
+SENTIMENT_NAMES = {0: 'Tiêu cực', 1: 'Trung tính', 2: 'Tích cực'}
+
+
+class SentimentPredictor:
+    """
+    Gói model + vectorizer để dự đoán cả batch tweet thô trong một lượt:
+    clean_text -> vectorizer.transform (1 ma trận thưa cho cả batch) -> predict_proba.
+    - vectorizer: bất kỳ object nào có transform(list_text) (TfidfVectorizer, HashingVectorizer...)
+    - clean: hàm làm sạch (mặc định clean_text_fast, cùng kết quả với clean_text)
+    """
+
+    def __init__(self, model, vectorizer, clean=clean_text_fast, label_names=None):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.clean = clean
+        self.label_names = SENTIMENT_NAMES if label_names is None else label_names
+
+    def predict_batch(self, texts):
+        cleaned = [self.clean(t) for t in texts]
+        X = self.vectorizer.transform(cleaned)
+        if hasattr(self.model, 'predict_proba'):
+            proba = self.model.predict_proba(X)
+            classes = getattr(self.model, 'classes_', None)
+            if classes is None:
+                classes = np.arange(proba.shape[1])
+            labels = np.asarray(classes)[np.argmax(proba, axis=1)]
+        else:
+            proba = None
+            labels = np.asarray(self.model.predict(X))
+
+        results = []
+        for i, label in enumerate(labels.tolist()):
+            item = {'label': label, 'sentiment': self.label_names.get(label, str(label))}
+            if proba is not None:
+                item['proba'] = proba[i].tolist()
+            results.append(item)
+        return results
+
+    def predict(self, text):
+        """Tương đương predict_sentiment(text) trong notebook."""
+        return self.predict_batch([text])[0]['sentiment']
+
+
+def save_predictor(path, model, vectorizer):
+    """Lưu model + vectorizer đã huấn luyện vào một file pickle."""
+    with open(path, 'wb') as f:
+        pickle.dump({'model': model, 'vectorizer': vectorizer}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_predictor(path, **kwargs):
+    with open(path, 'rb') as f:
+        bundle = pickle.load(f)
+    return SentimentPredictor(bundle['model'], bundle['vectorizer'], **kwargs)
+
+
+# ================================================================================================
+# THỐNG KÊ ĐỘ TRỄ
+# ================================================================================================
+class LatencyStats:
+    """Giữ `window` độ trễ gần nhất (giây) để tính p50/p99, cùng tổng số request / batch."""
+
+    def __init__(self, window=10_000):
+        self.latencies = deque(maxlen=window)
+        self.n_requests = 0
+        self.n_batches = 0
+        self.n_batch_items = 0
+        self.started = time.perf_counter()
+
+    def record_batch(self, size):
+        self.n_batches += 1
+        self.n_batch_items += size
+
+    def record(self, latency):
+        self.latencies.append(latency)
+        self.n_requests += 1
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        lat = np.array(self.latencies) * 1000
+        return {
+            'requests': self.n_requests,
+            'batches': self.n_batches,
+            'mean_batch_size': self.n_batch_items / self.n_batches if self.n_batches else 0.0,
+            'p50_ms': float(np.percentile(lat, 50)) if len(lat) else None,
+            'p99_ms': float(np.percentile(lat, 99)) if len(lat) else None,
+            'throughput_rps': self.n_requests / elapsed if elapsed > 0 else 0.0,
+            'uptime_s': elapsed,
+        }
+
+
+# ================================================================================================
+# MICRO-BATCHING
+# ================================================================================================
+class MicroBatcher:
+    """
+    Gom các text đến trong hàng đợi thành batch và gọi `predict_batch` một lần cho cả batch.
+    Batch được xả khi đủ max_batch_size text HOẶC text đầu tiên đã chờ quá max_delay giây.
+    predict_batch chạy trong một thread riêng (không dùng chung executor mặc định của loop)
+    để event loop vẫn nhận request mới trong lúc tính.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_delay=0.005, stats=None):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.stats = LatencyStats() if stats is None else stats
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='predict')
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def submit(self, text):
+        """Đưa một text vào hàng đợi, trả về kết quả dự đoán khi batch chứa nó được xử lý."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            # Lấy hết phần đã có sẵn trong hàng đợi trước khi phải chờ
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_batch, texts)
+            except Exception as exc:  # lỗi của batch trả về cho từng request, server vẫn chạy
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            now = time.perf_counter()
+            self.stats.record_batch(len(batch))
+            for (_, future, t0), result in zip(batch, results):
+                self.stats.record(now - t0)
+                if not future.done():
+                    future.set_result(result)
+
+
+# ================================================================================================
+# HTTP SERVER (asyncio, không cần thư viện ngoài)
+# ================================================================================================
+# POST /predict  {"text": "..."} hoặc {"texts": ["...", ...]}
+# GET  /stats    -> p50/p99 (ms), throughput, kích thước batch trung bình
+# GET  /health
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+MAX_BODY_SIZE = 1 << 20
+
+
+class InferenceServer:
+    def __init__(self, predictor, host='127.0.0.1', port=8000, max_batch_size=64, max_delay=0.005):
+        self.predictor = predictor
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(predictor.predict_batch, max_batch_size, max_delay)
+        self._server = None
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # port=0 -> hệ điều hành chọn port trống
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Inference server đang chạy tại http://{self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        if method == 'GET' and path == '/stats':
+            return 200, self.batcher.stats.summary()
+        if method == 'POST' and path == '/predict':
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                return 400, {'error': 'body phải là JSON'}
+            if isinstance(payload, dict) and isinstance(payload.get('text'), str):
+                return 200, await self.batcher.submit(payload['text'])
+            if isinstance(payload, dict) and isinstance(payload.get('texts'), list):
+                results = await asyncio.gather(*(self.batcher.submit(str(t)) for t in payload['texts']))
+                return 200, {'results': list(results)}
+            return 400, {'error': 'cần trường "text" (str) hoặc "texts" (list)'}
+        return 404, {'error': f'không có endpoint {method} {path}'}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                if len(parts) < 2:
+                    break
+                method, path = parts[0].upper(), parts[1].split('?', 1)[0]
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Không biết body dài bao nhiêu -> không đọc tiếp được request sau, đóng kết nối
+                    status, result = 400, {'error': 'Content-Length không hợp lệ'}
+                    body = None
+                elif length > MAX_BODY_SIZE:
+                    status, result = 400, {'error': 'body quá lớn'}
+                    body = None
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, result = await self._route(method, path, body)
+                    except Exception as exc:
+                        status, result = 500, {'error': repr(exc)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and body is not None
+                data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def request_json(host, port, method, path, payload=None, timeout=10):
+    """Client nhỏ (đồng bộ) để gọi server trên localhost, trả về (status, dict)."""
+    import http.client
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        body = None if payload is None else json.dumps(payload).encode('utf-8')
+        conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read() or b'{}')
+    finally:
+        conn.close()
+
+
+# ================================================================================================
+# CLI: python -m src.serving --model model.pkl
+# ================================================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server dự đoán cảm xúc tweet (micro-batching)")
+    parser.add_argument('--model', required=True, help="file pickle tạo bởi save_predictor()")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-delay-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    predictor = load_predictor(args.model)
+    server = InferenceServer(predictor, args.host, args.port, args.max_batch_size, args.max_delay_ms / 1000)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
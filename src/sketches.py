@@ -0,0 +1,184 @@
+import heapq
+from collections import Counter
+from zlib import crc32
+
+import numpy as np
+
+
+# ================================================================================================
+# SPACE-SAVING (top-k với bộ nhớ cố định)
+# ================================================================================================
+class SpaceSaving:
+    """
+    Đếm xấp xỉ các phần tử xuất hiện nhiều nhất, chỉ giữ tối đa `capacity` phần tử.
+    Với mỗi phần tử được giữ: count - error <= tần suất thật <= count,
+    sai số tối đa n / capacity (n = tổng số phần tử đã đếm).
+
+    Dữ liệu được nạp theo batch: mỗi batch được đếm chính xác bằng Counter rồi gộp vào
+    sketch theo quy tắc merge của Space-Saving, nên hai sketch (từ 2 worker) cũng gộp được.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("capacity phải >= 1")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.n = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _min_count(self):
+        # Khi sketch chưa đầy, phần tử không được giữ chắc chắn chưa xuất hiện -> 0
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def _merge_counts(self, counts, errors, other_min, other_n):
+        self_min = self._min_count()
+        merged = {}
+        merged_err = {}
+        for x, c in self.counts.items():
+            merged[x] = c + counts.get(x, other_min)
+            merged_err[x] = self.errors[x] + errors.get(x, other_min)
+        for x, c in counts.items():
+            if x not in merged:
+                merged[x] = self_min + c
+                merged_err[x] = self_min + errors.get(x, 0)
+
+        if len(merged) > self.capacity:
+            keep = heapq.nlargest(self.capacity, merged, key=merged.get)
+            merged = {x: merged[x] for x in keep}
+            merged_err = {x: merged_err[x] for x in keep}
+        self.counts = merged
+        self.errors = merged_err
+        self.n += other_n
+
+    def update(self, items):
+        """Nạp một batch phần tử (iterable)."""
+        batch = Counter(items)
+        self._merge_counts(batch, {}, 0, sum(batch.values()))
+        return self
+
+    def merge(self, other):
+        """Gộp một SpaceSaving khác (ví dụ đếm trên shard của worker khác)."""
+        self._merge_counts(other.counts, other.errors, other._min_count(), other.n)
+        return self
+
+    def most_common(self, top_k=None):
+        """[(phần tử, count ước lượng), ...] giảm dần, giống Counter.most_common."""
+        items = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return items if top_k is None else items[:top_k]
+
+    def bounds(self, item):
+        """(cận dưới, cận trên) của tần suất thật."""
+        if item in self.counts:
+            return self.counts[item] - self.errors[item], self.counts[item]
+        return 0, self._min_count()
+
+
+# ================================================================================================
+# COUNT-MIN SKETCH
+# ================================================================================================
+_PRIME = (1 << 31) - 1
+
+
+def _item_hashes(items):
+    return np.fromiter((crc32(str(x).encode('utf-8')) for x in items), dtype=np.uint64, count=len(items))
+
+
+class CountMinSketch:
+    """
+    Bảng đếm (depth, width): mỗi phần tử cộng vào 1 ô trên mỗi hàng (hash khác nhau),
+    ước lượng = min theo các hàng. Chỉ đếm dư, sai số <= e * n / width với xác suất 1 - e^-depth.
+    Hai sketch cùng (width, depth, seed) gộp được bằng phép cộng bảng.
+    """
+
+    def __init__(self, width=1 << 16, depth=4, seed=0):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=depth, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=depth, dtype=np.uint64)
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.n = 0
+
+    def _cells(self, items):
+        h = _item_hashes(items) % _PRIME
+        # (a * h + b) mod p: a, h < 2^31 nên tích không tràn uint64
+        return ((self._a[:, None] * h[None, :] + self._b[:, None]) % _PRIME) % self.width
+
+    def update(self, items, counts=None):
+        items = list(items)
+        if not items:
+            return self
+        weights = None if counts is None else np.asarray(counts, dtype=np.float64)
+        cells = self._cells(items)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(cells[row], weights=weights, minlength=self.width).astype(np.int64)
+        self.n += len(items) if counts is None else int(weights.sum())
+        return self
+
+    def estimate(self, items):
+        items = list(items)
+        if not items:
+            return np.empty(0, dtype=np.int64)
+        cells = self._cells(items)
+        return self.table[np.arange(self.depth)[:, None], cells].min(axis=0)
+
+    def merge(self, other):
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Chỉ gộp được CountMinSketch cùng width, depth, seed")
+        self.table += other.table
+        self.n += other.n
+        return self
+
+
+class CountMinTopK:
+    """
+    Count-Min Sketch + tập ứng viên có ước lượng lớn nhất (tối đa `capacity` phần tử)
+    để trả về top-k. Bộ nhớ: depth * width ô đếm + capacity ứng viên.
+    """
+
+    def __init__(self, capacity=1000, width=1 << 16, depth=4, seed=0):
+        self.capacity = capacity
+        self.sketch = CountMinSketch(width, depth, seed)
+        self.candidates = {}
+
+    @property
+    def n(self):
+        return self.sketch.n
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def _refresh(self, keys):
+        estimates = self.sketch.estimate(keys)
+        merged = dict(zip(keys, estimates.tolist()))
+        if len(merged) > self.capacity:
+            keep = heapq.nlargest(self.capacity, merged, key=merged.get)
+            merged = {x: merged[x] for x in keep}
+        self.candidates = merged
+
+    def update(self, items):
+        batch = Counter(items)
+        self.sketch.update(list(batch), list(batch.values()))
+        self._refresh(list(dict.fromkeys([*self.candidates, *batch])))
+        return self
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        self._refresh(list(dict.fromkeys([*self.candidates, *other.candidates])))
+        return self
+
+    def most_common(self, top_k=None):
+        items = sorted(self.candidates.items(), key=lambda kv: kv[1], reverse=True)
+        return items if top_k is None else items[:top_k]
+
+
+SKETCHES = {
+    'spacesaving': SpaceSaving,
+    'countmin': CountMinTopK,
+}
@@ -0,0 +1,253 @@
+import json
+import numbers
+import os
+
+import numpy as np
+
+
+# ================================================================================================
+# COLUMNAR STORE
+# ================================================================================================
+# Cấu trúc thư mục lưu trữ:
+#   schema.json              -> {"version", "n_rows", "columns": {tên: {"kind", "dtype"}}}
+#   <cột số>.bin             -> mảng thô little-endian (int, float, bool, datetime64...)
+#   <cột chuỗi>.data         -> toàn bộ chuỗi UTF-8 nối liền nhau
+#   <cột chuỗi>.offsets      -> int64, n_rows + 1 vị trí biên của từng chuỗi trong .data
+# Mọi file đều mở lại bằng np.memmap nên load chỉ tốn page fault, không cần unpickle.
+
+SCHEMA_FILE = 'schema.json'
+STORE_VERSION = 1
+
+
+class StringColumn:
+    """Cột chuỗi đọc trực tiếp từ vùng UTF-8 đã memory-map, chỉ decode khi truy cập."""
+
+    def __init__(self, data, offsets):
+        self._data = data        # uint8, toàn bộ byte của cột
+        self._offsets = offsets  # int64, độ dài n_rows + 1
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def _decode(self, i):
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8')
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            n = len(self)
+            if key < 0:
+                key += n
+            if not 0 <= key < n:
+                raise IndexError(f"index {key} nằm ngoài cột có {n} dòng")
+            return self._decode(int(key))
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                # Slice liên tục -> vẫn là view, không copy
+                return StringColumn(self._data, self._offsets[start:stop + 1] if stop > start
+                                    else self._offsets[start:start + 1])
+            key = np.arange(start, stop, step)
+        idx = np.arange(len(self))[key]
+        return np.array([self._decode(i) for i in idx], dtype=str)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._decode(i)
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.to_numpy()
+        return arr if dtype is None else arr.astype(dtype)
+
+    def to_numpy(self):
+        """Decode toàn bộ cột thành mảng chuỗi NumPy."""
+        return np.array(list(self), dtype=str)
+
+    def __repr__(self):
+        return f"StringColumn(n_rows={len(self)})"
+
+
+def _as_columns(data):
+    """Chấp nhận dict {tên: mảng} hoặc Structured Array."""
+    if isinstance(data, np.ndarray) and data.dtype.names is not None:
+        return {name: data[name] for name in data.dtype.names}
+    return dict(data)
+
+
+def _value_kind(v):
+    if isinstance(v, (bool, np.bool_)):
+        return 'bool'
+    if isinstance(v, numbers.Integral):
+        return 'int'
+    if isinstance(v, numbers.Real):
+        return 'float'
+    if isinstance(v, (str, bytes)):
+        return 'str'
+    return 'other'
+
+
+def _normalize_column(col):
+    """
+    Cột kiểu object (vd. field của Structured Array trong notebook) được phân loại theo GIÁ TRỊ:
+    toàn bool -> bool, toàn số nguyên -> int64, số nguyên + số thực -> float64, còn lại -> chuỗi.
+    Trộn số/bool với chuỗi -> ValueError thay vì âm thầm lưu thành chuỗi.
+    """
+    col = np.asarray(col)
+    if col.dtype.kind != 'O' or len(col) == 0:
+        return col
+    kinds = {_value_kind(v) for v in col}
+    if kinds == {'bool'}:
+        return col.astype(bool)
+    if kinds == {'int'}:
+        return col.astype(np.int64)
+    if kinds <= {'int', 'float'}:
+        return col.astype(np.float64)
+    if kinds & {'bool', 'int', 'float'}:
+        raise ValueError(f"Cột object chứa lẫn nhiều kiểu giá trị: {sorted(kinds)}")
+    return col
+
+
+def _column_kind(col):
+    if col.dtype.kind in 'OUS':
+        return 'str'
+    return 'numeric'
+
+
+def _encode_strings(col):
+    """Nối các chuỗi thành một khối UTF-8 + mảng độ dài tích lũy."""
+    encoded = [(s.decode('utf-8') if isinstance(s, bytes) else str(s)).encode('utf-8') for s in col]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    return b''.join(encoded), np.cumsum(lengths)
+
+
+def _read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_schema(path, schema):
+    # Ghi file tạm rồi rename để schema luôn nhất quán với dữ liệu đã ghi
+    tmp = os.path.join(path, SCHEMA_FILE + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(path, SCHEMA_FILE))
+
+
+def _write_column(path, name, col, meta, mode, base_offset=0):
+    if meta['kind'] == 'str':
+        blob, ends = _encode_strings(col)
+        if mode == 'wb':
+            # Ghi mới -> offsets bắt đầu bằng 0
+            ends = np.concatenate(([0], ends))
+        with open(os.path.join(path, name + '.data'), mode) as f:
+            f.write(blob)
+        with open(os.path.join(path, name + '.offsets'), mode) as f:
+            f.write((ends + base_offset).astype('<i8').tobytes())
+    else:
+        arr = np.ascontiguousarray(col, dtype=np.dtype(meta['dtype']))
+        with open(os.path.join(path, name + '.bin'), mode) as f:
+            f.write(arr.tobytes())
+
+
+def save_columns(path, data):
+    """
+    Ghi dữ liệu (dict hoặc Structured Array) thành thư mục columnar tại `path`.
+    Ghi đè nếu thư mục đã có dữ liệu.
+    """
+    columns = _as_columns(data)
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("Các cột phải có cùng số dòng")
+
+    os.makedirs(path, exist_ok=True)
+    schema = {'version': STORE_VERSION, 'n_rows': lengths.pop() if lengths else 0, 'columns': {}}
+    for name, col in columns.items():
+        col = _normalize_column(col)
+        kind = _column_kind(col)
+        meta = {'kind': kind}
+        if kind == 'numeric':
+            meta['dtype'] = col.dtype.newbyteorder('<').str
+        schema['columns'][name] = meta
+        _write_column(path, name, col, meta, 'wb')
+
+    _write_schema(path, schema)
+    return schema
+
+
+def append_columns(path, data):
+    """
+    Nối thêm các dòng mới vào cuối store mà không ghi lại dữ liệu cũ.
+    Tập cột phải trùng với schema hiện có.
+    """
+    if not os.path.exists(os.path.join(path, SCHEMA_FILE)):
+        return save_columns(path, data)
+
+    schema = _read_schema(path)
+    columns = _as_columns(data)
+    if set(columns) != set(schema['columns']):
+        raise ValueError(f"Tập cột {sorted(columns)} không khớp schema {sorted(schema['columns'])}")
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("Các cột phải có cùng số dòng")
+
+    n_rows = schema['n_rows']
+    for name, meta in schema['columns'].items():
+        col = _normalize_column(columns[name])
+        base_offset = 0
+        # Cắt bỏ phần đuôi ghi dở (nếu lần append trước bị ngắt) để file khớp với schema
+        if meta['kind'] == 'str':
+            offsets_file = os.path.join(path, name + '.offsets')
+            base_offset = int(_memmap(offsets_file, '<i8', n_rows + 1)[-1])
+            os.truncate(offsets_file, (n_rows + 1) * 8)
+            os.truncate(os.path.join(path, name + '.data'), base_offset)
+        else:
+            os.truncate(os.path.join(path, name + '.bin'), n_rows * np.dtype(meta['dtype']).itemsize)
+        _write_column(path, name, col, meta, 'ab', base_offset)
+
+    schema['n_rows'] = n_rows + lengths.pop()
+    _write_schema(path, schema)
+    return schema
+
+
+def _memmap(file, dtype, count):
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(file, dtype=dtype, mode='r', shape=(count,))
+
+
+def load_columns(path, columns=None):
+    """
+    Mở store bằng memory mapping (zero copy).
+    - columns: danh sách cột cần lấy (None = tất cả)
+    Trả về dict: tên cột -> np.memmap (cột số) hoặc StringColumn (cột chuỗi).
+    """
+    schema = _read_schema(path)
+    n_rows = schema['n_rows']
+    names = list(schema['columns']) if columns is None else list(columns)
+
+    result = {}
+    for name in names:
+        if name not in schema['columns']:
+            raise KeyError(f"Cột '{name}' không có trong store {path}")
+        meta = schema['columns'][name]
+        if meta['kind'] == 'str':
+            offsets = _memmap(os.path.join(path, name + '.offsets'), '<i8', n_rows + 1)
+            data = _memmap(os.path.join(path, name + '.data'), np.uint8, int(offsets[-1]))
+            result[name] = StringColumn(data, offsets)
+        else:
+            result[name] = _memmap(os.path.join(path, name + '.bin'), np.dtype(meta['dtype']), n_rows)
+    return result
+
+
+def load_structured(path, columns=None):
+    """
+    Đọc store thành Structured Array trong bộ nhớ (copy), cho code cũ cần `data.dtype.names`.
+    Cột chuỗi trả về dạng object (như mảng của notebook 01) để gán lại chuỗi dài hơn không bị cắt.
+    """
+    loaded = load_columns(path, columns)
+    arrays = {name: col.to_numpy().astype(object) if isinstance(col, StringColumn) else np.asarray(col)
+              for name, col in loaded.items()}
+    n_rows = _read_schema(path)['n_rows']
+    data = np.empty(n_rows, dtype=[(name, col.dtype) for name, col in arrays.items()])
+    for name, col in arrays.items():
+        data[name] = col
+    return data
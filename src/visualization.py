@@ -0,0 +1,22 @@
+# ================================
+# GLOBAL IMPORT
+# ================================
+# Import module này là bước "bật" phần vẽ biểu đồ: matplotlib/seaborn chỉ được nạp ở đây,
+# còn src.config / src.data_processing / src.models chỉ cần NumPy (import nhanh, chạy được headless).
+#
+#   from src.visualization import *    # = from src.config import * + plt, sns đã cấu hình
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from src.config import *
+
+
+# --- Cài đặt cấu hình trực quan hóa ---
+def setup_plotting(style="whitegrid", figsize=(10, 6), font_size=12):
+    """Áp dụng style seaborn và rcParams dùng chung cho các notebook."""
+    sns.set_style(style)
+    plt.rcParams['figure.figsize'] = figsize
+    plt.rcParams['font.size'] = font_size
+
+
+setup_plotting()
@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.data_processing import (CLEAN_TEXT_ENGINES, check_clean_text_parity, clean_text, clean_text_fast,
+                                 clean_texts, generate_parity_corpus)
+
+
+# clean_text_fast là engine mặc định của clean_texts / pipeline -> output phải GIỐNG HỆT clean_text.
+# Lệch ở đây nghĩa là clean_text, EMOJI_MAP, MY_STOP_WORDS hoặc pattern của engine "fast" đã bị sửa một phía.
+def test_random_corpus_parity():
+    assert check_clean_text_parity(n=20_000, seed=0) == []
+
+
+def test_random_corpus_parity_other_seed():
+    assert check_clean_text_parity(n=5_000, seed=1) == []
+
+
+def test_tweet_samples_parity():
+    samples = [
+        "",
+        "   ",
+        "The vaccine is amazing and safe! 😍💉 #PfizerBioNTech https://t.co/abc123",
+        "@user1 @user2 I'm NOT getting it... side-effects?? 🤔",
+        "RT @news: 1st dose done\nfeeling great 💪 #CovidVaccine #Pfizer",
+        "Caring, flying, happily, relational, conditional ... running",
+        "&amp; &lt;3 www.example.com/vaccine http://bit.ly/x",
+    ]
+    assert check_clean_text_parity(samples) == []
+
+
+def test_batch_engines_match():
+    texts = generate_parity_corpus(3_000, seed=2)
+    fast = clean_texts(texts, workers=1, engine='fast')
+    reference = clean_texts(texts, workers=1, engine='reference')
+    assert fast == reference
+    assert CLEAN_TEXT_ENGINES['fast'] is clean_text_fast
+    assert CLEAN_TEXT_ENGINES['reference'] is clean_text
+
+
+def test_bytes_input():
+    text = "Got my shot today 💉 #vaccinated".encode('utf-8')
+    assert clean_texts(np.array([text], dtype=object), workers=1) == [clean_text(text.decode('utf-8'))]
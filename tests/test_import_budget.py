@@ -0,0 +1,19 @@
+import pytest
+
+from src.benchmark import HEADLESS_MODULES, IMPORT_BUDGET_MS, measure_import_time
+
+
+# Các module trong src phải import được chỉ với NumPy (đo trong process Python mới, xem
+# src/benchmark.py). Phần vẽ nằm trong src.visualization nên không có trong HEADLESS_MODULES.
+@pytest.fixture(scope='module')
+def headless_import():
+    return measure_import_time(HEADLESS_MODULES)
+
+
+@pytest.mark.parametrize('library', ['matplotlib', 'sklearn', 'scipy'])
+def test_headless_import_skips_heavy_library(headless_import, library):
+    assert library not in headless_import['heavy']
+
+
+def test_headless_import_within_budget(headless_import):
+    assert headless_import['ms'] <= IMPORT_BUDGET_MS